@@ -0,0 +1,121 @@
+import os
+import glob
+import json
+from datetime import datetime
+from db_engine import transaction, begin_run, close_db
+
+# -------------------------
+# BUS FACTOR (TRUCK FACTOR)
+# -------------------------
+# For every file, directory ("module") and the team's whole codebase: the
+# fewest authors who together wrote COVERAGE of its changed lines. Computed as
+# window functions inside DuckDB over commit_files.csv, stored as a new version
+# of the bus_factor table, so the dashboard only reads it.
+#
+# knowledge_risk then rolls the single-owner files (bus factor 1) up per
+# author: how much of the codebase nobody else knows if that person leaves.
+
+DATA_DIR = "github_data"
+# Per-repo partitions written by github_data/multi_repo.py
+PARTITIONS_DIR = os.path.join(DATA_DIR, "repos")
+FILES_FILE = "commit_files.csv"
+
+COVERAGE = 0.5  # share of changed lines the key people must cover
+
+# Paths are prefixed with the repo partition when there are several, as in ownership.py
+OWNED_TABLE = """
+CREATE OR REPLACE TEMP TABLE owned AS
+SELECT path, author, SUM(lines) AS lines
+FROM (
+    SELECT CASE WHEN {partitioned}
+                THEN regexp_extract(filename, '([^/\\\\]+)[/\\\\][^/\\\\]+$', 1) || '/' || path
+                ELSE path END AS path,
+           user AS author,
+           COALESCE(TRY_CAST(changes AS BIGINT), 0) AS lines
+    FROM read_csv_auto([{paths}], all_varchar = true, union_by_name = true, filename = true)
+)
+GROUP BY ALL
+HAVING SUM(lines) > 0
+"""
+
+# Authors ranked by lines within each scope; an author is a key person while
+# the lines of everyone ranked above them still fall short of COVERAGE
+BUS_FACTOR = """
+INSERT INTO bus_factor
+WITH scoped AS (
+    SELECT 'file' AS scope, path AS name, author, lines FROM owned
+    UNION ALL
+    SELECT 'module', COALESCE(NULLIF(regexp_extract(path, '^(.*)/[^/]*$', 1), ''), '.'), author, SUM(lines)
+    FROM owned GROUP BY ALL
+    UNION ALL
+    SELECT 'team', '*', author, SUM(lines) FROM owned GROUP BY author
+),
+ranked AS (
+    SELECT *,
+           SUM(lines) OVER (PARTITION BY scope, name ORDER BY lines DESC, author
+                            ROWS UNBOUNDED PRECEDING) - lines AS lines_before,
+           SUM(lines) OVER (PARTITION BY scope, name) AS total
+    FROM scoped
+)
+SELECT $version, scope, name, total, COUNT(*),
+       COUNT(*) FILTER (WHERE lines_before < $coverage * total),
+       to_json(list(author ORDER BY lines DESC, author) FILTER (WHERE lines_before < $coverage * total))::TEXT,
+       arg_max(author, lines),
+       MAX(lines) / total,
+       $generated_at
+FROM ranked
+GROUP BY scope, name, total
+"""
+
+KNOWLEDGE_RISK = """
+INSERT INTO knowledge_risk
+SELECT $version, top_author, COUNT(*), SUM(total_lines),
+       SUM(total_lines) * 100 / (SELECT SUM(total_lines) FROM bus_factor
+                                 WHERE version = $version AND scope = 'file'),
+       $generated_at
+FROM bus_factor
+WHERE version = $version AND scope = 'file' AND bus_factor = 1
+GROUP BY top_author
+"""
+
+
+def dataset_paths():
+    """Every repo partition's commit_files.csv, or the single-repo export; and whether they are partitions."""
+    paths = sorted(glob.glob(os.path.join(PARTITIONS_DIR, "*", FILES_FILE)))
+    if paths:
+        return paths, True
+    single = os.path.join(DATA_DIR, FILES_FILE)
+    return ([single] if os.path.exists(single) else []), False
+
+
+if __name__ == "__main__":
+    paths, partitioned = dataset_paths()
+    if not paths:
+        print(f"⚠️ No {FILES_FILE} found; run github_export.py first")
+        raise SystemExit(0)
+
+    generated_at = datetime.now()
+    quoted = ", ".join("'" + p.replace("'", "''") + "'" for p in paths)
+
+    with transaction() as db:
+        db.execute(OWNED_TABLE.format(paths=quoted, partitioned=str(partitioned).lower()))
+
+        version = begin_run(db, "bus_factor")
+        params = {"version": version, "coverage": COVERAGE, "generated_at": generated_at}
+        db.execute(BUS_FACTOR, params)
+        db.execute(KNOWLEDGE_RISK, {k: params[k] for k in ("version", "generated_at")})
+
+        counts = dict(db.execute("""
+            SELECT scope, COUNT(*) FROM bus_factor WHERE version = ? GROUP BY scope
+        """, (version,)).fetchall())
+        team = db.execute("""
+            SELECT bus_factor, key_people FROM bus_factor WHERE version = ? AND scope = 'team'
+        """, (version,)).fetchone()
+
+    close_db()
+
+    print(f"✅ Bus factor stored as version v{version}: "
+          f"{counts.get('file', 0)} files, {counts.get('module', 0)} modules")
+    if team:
+        key_people = json.loads(team[1])
+        print(f"🚌 Team truck factor: {team[0]} ({', '.join(key_people[:5])}{', ...' if len(key_people) > 5 else ''})")
@@ -0,0 +1,207 @@
+import json
+from db_engine import read_db
+
+# --------------------------
+# DASHBOARD QUERIES
+# --------------------------
+# Read-only SQL behind work_monitor.py. Every query is scoped to one version of
+# final_team_intelligence, and filtering, ranking and paging run in DuckDB so
+# the dashboard only ever receives the rows it shows.
+
+# Same x10 score scaling the dashboard has always shown
+MEMBERS = """
+WITH members AS (
+    SELECT row_number() OVER (ORDER BY merged_score DESC, name) AS rank,
+           name,
+           final_behavior AS category,
+           merged_score * 10 AS score,
+           git_score * 10 AS impact,
+           meeting_score * 10 AS activity
+    FROM final_team_intelligence
+    WHERE version = ?
+)
+"""
+
+
+def query(sql, params=()):
+    with read_db() as db:
+        return db.execute(sql, params).fetchall()
+
+
+def query_df(sql, params=()):
+    with read_db() as db:
+        return db.execute(sql, params).fetchdf()
+
+
+def list_versions():
+    """(version, generated_at) of every team intelligence version, newest first."""
+    return query("""
+        SELECT version, MAX(generated_at)
+        FROM final_team_intelligence
+        GROUP BY version
+        ORDER BY version DESC
+    """)
+
+
+def member_filter(category=None, search=None, pattern=None):
+    """WHERE clause and params. category is an exact role, pattern a substring of it, search a substring of the name."""
+    clauses, params = [], []
+    if category:
+        clauses.append("category = ?")
+        params.append(category)
+    if pattern:
+        clauses.append("category ILIKE ?")
+        params.append(f"%{pattern}%")
+    if search:
+        clauses.append("name ILIKE ?")
+        params.append(f"%{search}%")
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def count_members(version, category=None, search=None, pattern=None):
+    where, params = member_filter(category, search, pattern)
+    return query(MEMBERS + f"SELECT COUNT(*) FROM members{where}", [version, *params])[0][0]
+
+
+def member_page(version, category=None, search=None, pattern=None, limit=50, offset=0):
+    where, params = member_filter(category, search, pattern)
+    return query_df(
+        MEMBERS + f"SELECT * FROM members{where} ORDER BY rank LIMIT ? OFFSET ?",
+        [version, *params, limit, offset]
+    )
+
+
+def category_counts(version):
+    return query(MEMBERS + """
+        SELECT category, COUNT(*) FROM members
+        GROUP BY category ORDER BY MIN(rank)
+    """, [version])
+
+
+def top_by_category(version, per_category):
+    """Highest-ranked names of each role."""
+    return query_df(MEMBERS + """
+        SELECT category, name FROM members
+        QUALIFY row_number() OVER (PARTITION BY category ORDER BY rank) <= ?
+        ORDER BY category, rank
+    """, [version, per_category])
+
+
+def scatter_points(version):
+    return query_df(MEMBERS + "SELECT name, activity, impact, category, score FROM members", [version])
+
+
+def score_extremes(version):
+    """Highest and lowest scoring member rows."""
+    best = member_page(version, limit=1)
+    worst = query_df(MEMBERS + "SELECT * FROM members ORDER BY score ASC, rank DESC LIMIT 1", [version])
+    return best.iloc[0], worst.iloc[0]
+
+
+def version_for(table, version):
+    """The newest version of another table written at or before a team version (else its newest overall).
+
+    None if the table does not exist yet (its writer has never run).
+    """
+    exists = query("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [table])[0][0]
+    if not exists:
+        return None
+    rows = query(f"""
+        SELECT COALESCE(MAX(version) FILTER (WHERE version <= ?), MAX(version))
+        FROM {table}
+    """, [version])
+    return rows[0][0]
+
+
+# --------------------------
+# BUS FACTOR (bus_factor.py)
+# --------------------------
+
+def bus_factor_summary(bf_version):
+    """Team truck factor and key people, plus how many files / modules have a bus factor of 1."""
+    rows = query("""
+        SELECT scope,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE bus_factor = 1),
+               MAX(bus_factor) FILTER (WHERE scope = 'team'),
+               MAX(key_people) FILTER (WHERE scope = 'team')
+        FROM bus_factor WHERE version = ?
+        GROUP BY scope
+    """, [bf_version])
+
+    summary = {"truck_factor": None, "key_people": []}
+    for scope, total, single, truck_factor, key_people in rows:
+        summary[scope] = (total, single)
+        if scope == "team":
+            summary["truck_factor"] = truck_factor
+            summary["key_people"] = json.loads(key_people or "[]")
+    return summary
+
+
+def risky_modules(bf_version, limit=50, offset=0):
+    """Modules with the fewest key people, biggest first."""
+    df = query_df("""
+        SELECT name AS module, bus_factor, authors, total_lines, key_people, top_share * 100 AS top_share
+        FROM bus_factor
+        WHERE version = ? AND scope = 'module'
+        ORDER BY bus_factor, total_lines DESC, name
+        LIMIT ? OFFSET ?
+    """, [bf_version, limit, offset])
+    df["key_people"] = df["key_people"].apply(lambda x: ", ".join(json.loads(x or "[]")))
+    return df
+
+
+def count_knowledge_risk(bf_version):
+    return query("SELECT COUNT(*) FROM knowledge_risk WHERE version = ?", [bf_version])[0][0]
+
+
+def knowledge_risk_page(bf_version, limit=50, offset=0):
+    """People by share of the codebase only they know (files with a bus factor of 1)."""
+    return query_df("""
+        SELECT name, sole_owned_files, lines_at_risk, loss_pct
+        FROM knowledge_risk
+        WHERE version = ?
+        ORDER BY loss_pct DESC, name
+        LIMIT ? OFFSET ?
+    """, [bf_version, limit, offset])
+
+
+# --------------------------
+# MEETING INTELLIGENCE
+# --------------------------
+
+def meeting_version_for(version):
+    """The newest meeting analysis written at or before a team version (else the newest overall)."""
+    return version_for("meeting_intelligence", version)
+
+
+def meeting_overview(meeting_version, speakers=3):
+    """Same shape as meeting_intelligence.json, minus member_analysis."""
+    rows = query("""
+        SELECT overall_meeting_summary, meeting_topics
+        FROM meeting_intelligence WHERE version = ? LIMIT 1
+    """, [meeting_version])
+    if not rows:
+        return {}
+
+    by_time = [r[0] for r in query("""
+        SELECT name FROM meeting_intelligence
+        WHERE version = ? ORDER BY time_spoken_seconds
+    """, [meeting_version])]
+
+    return {
+        "overall_meeting_summary": rows[0][0],
+        "meeting_topics": json.loads(rows[0][1] or "[]"),
+        "dominant_speakers": by_time[-speakers:],
+        "silent_speakers": by_time[:speakers]
+    }
+
+
+def meeting_members(meeting_version):
+    df = query_df("""
+        SELECT name, behavior_type, time_spoken_seconds, involvement_score,
+               lines_spoken, important_topics, summary
+        FROM meeting_intelligence WHERE version = ?
+    """, [meeting_version])
+    df["important_topics"] = df["important_topics"].apply(lambda x: json.loads(x or "[]"))
+    return df
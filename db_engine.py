@@ -1,14 +1,72 @@
+import time
 import duckdb
+import pandas as pd
+from datetime import datetime
+from contextlib import contextmanager
 
 DB_FILE = "hacknox.db"
+VERSIONED_TABLES = [
+    "meeting_intelligence", "git_intelligence", "final_team_intelligence", "bus_factor", "knowledge_risk"
+]
+
+# DuckDB lets one process write the file at a time; other pipeline steps wait this long for it
+LOCK_TIMEOUT = 60
+# Readers such as the dashboard give up much sooner: a pipeline step holds the
+# lock for its whole run, and a page render issues many queries
+READ_LOCK_TIMEOUT = 1
+
+# One connection per process, shared by every writer in it
+_db = None
+
+
+class DatabaseBusy(duckdb.IOException):
+    """Another process kept the database locked for longer than the caller would wait."""
+
+
+def connect(read_only=False, timeout=LOCK_TIMEOUT):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return duckdb.connect(DB_FILE, read_only=read_only)
+        except duckdb.IOException as e:
+            if "lock" not in str(e).lower():
+                raise
+            if time.time() > deadline:
+                raise DatabaseBusy(f"{DB_FILE} is locked by another process: {e}") from e
+            time.sleep(0.2)
+
 
 def get_db():
-    return duckdb.connect(DB_FILE)
+    global _db
+    if _db is None:
+        _db = connect()
+        create_tables(_db)
+    return _db
 
 
-def init_db():
-    db = get_db()
+@contextmanager
+def read_db():
+    """Short-lived read-only connection for readers such as the dashboard.
+
+    Opening one per query keeps readers from holding the file lock between
+    queries, so pipeline writers are never shut out for long. While a writer
+    holds the file, raises DatabaseBusy after READ_LOCK_TIMEOUT instead of waiting.
+    """
+    db = connect(read_only=True, timeout=READ_LOCK_TIMEOUT)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def close_db():
+    global _db
+    if _db is not None:
+        _db.close()
+        _db = None
 
+
+def create_tables(db):
     db.execute("""
     CREATE TABLE IF NOT EXISTS meeting_intelligence (
         version INTEGER,
@@ -52,11 +110,94 @@ def init_db():
     )
     """)
 
-    db.close()
+    # scope is 'file', 'module' (directory) or 'team' (name '*'); key_people is a JSON list
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS bus_factor (
+        version INTEGER,
+        scope TEXT,
+        name TEXT,
+        total_lines BIGINT,
+        authors INTEGER,
+        bus_factor INTEGER,
+        key_people TEXT,
+        top_author TEXT,
+        top_share DOUBLE,
+        generated_at TIMESTAMP
+    )
+    """)
+
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS knowledge_risk (
+        version INTEGER,
+        name TEXT,
+        sole_owned_files INTEGER,
+        lines_at_risk BIGINT,
+        loss_pct DOUBLE,
+        generated_at TIMESTAMP
+    )
+    """)
+
+    # Run ids continue after any versions written before the runs table existed
+    start = max(
+        db.execute(f"SELECT COALESCE(MAX(version), 0) FROM {t}").fetchone()[0]
+        for t in VERSIONED_TABLES
+    ) + 1
+    db.execute(f"CREATE SEQUENCE IF NOT EXISTS run_id_seq START {start}")
+
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY,
+        writer TEXT,
+        started_at TIMESTAMP
+    )
+    """)
+
+    for t in VERSIONED_TABLES:
+        db.execute(f"CREATE INDEX IF NOT EXISTS idx_{t}_version_name ON {t} (version, name)")
 
 
-def get_next_version(table_name):
-    db = get_db()
-    v = db.execute(f"SELECT COALESCE(MAX(version), 0) + 1 FROM {table_name}").fetchone()[0]
+def init_db():
+    get_db()
+
+
+@contextmanager
+def transaction():
+    """Run a version write as one transaction.
+
+    Each transaction gets its own cursor on the shared connection, so threads
+    in one process (e.g. parallel ingestion workers) can write concurrently.
+    """
+    db = get_db().cursor()
+    db.execute("BEGIN TRANSACTION")
+    try:
+        yield db
+    except Exception:
+        db.execute("ROLLBACK")
+        db.close()
+        raise
+    db.execute("COMMIT")
     db.close()
-    return v
+
+
+def begin_run(db, writer):
+    """Allocate the version for this write inside the caller's transaction.
+
+    Ids come from a sequence, so concurrent writers can never get the same
+    version, and the runs table records who wrote each one.
+    """
+    run_id = db.execute("SELECT nextval('run_id_seq')").fetchone()[0]
+    db.execute("INSERT INTO runs VALUES (?, ?, ?)", (run_id, writer, datetime.now()))
+    return run_id
+
+
+def insert_rows(db, table_name, rows):
+    """Bulk insert tuples (in table column order) with a single INSERT ... SELECT."""
+    if not rows:
+        return
+
+    columns = [c[0] for c in db.execute(f"SELECT * FROM {table_name} LIMIT 0").description]
+    db.register("bulk_rows", pd.DataFrame(rows, columns=columns))
+    try:
+        db.execute(f"INSERT INTO {table_name} SELECT * FROM bulk_rows")
+    finally:
+        db.unregister("bulk_rows")
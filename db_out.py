@@ -1,9 +1,8 @@
-import duckdb
+from db_engine import read_db
 
-db = duckdb.connect("hacknox.db")
-
-print(db.execute("""
-SELECT version, name, git_score, git_behavior
-FROM git_intelligence
-ORDER BY version DESC, git_score DESC
-""").fetchall())
+with read_db() as db:
+    print(db.execute("""
+    SELECT version, name, git_score, git_behavior
+    FROM git_intelligence
+    ORDER BY version DESC, git_score DESC
+    """).fetchall())
@@ -1,6 +1,6 @@
 import json
 from datetime import datetime
-from db_engine import init_db, get_db, get_next_version
+from db_engine import init_db, transaction, insert_rows, begin_run, close_db
 
 MEETING_FILE = "meeting_intelligence.json"
 GIT_FILE = "git_intelligence.json"
@@ -10,8 +10,6 @@ OUTPUT_FILE = "final_team_intelligence.json"
 # INIT DATABASE
 # -------------------------
 init_db()
-db = get_db()
-version = get_next_version("final_team_intelligence")
 generated_at = datetime.now().isoformat()
 
 # -------------------------
@@ -81,61 +79,57 @@ with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
 print("🏁 FINAL PRODUCT FILE CREATED:", OUTPUT_FILE)
 
 # -------------------------
-# STORE MEETING DATA
+# STORE ALL THREE TABLES AS ONE VERSION (ONE TRANSACTION, BULK INSERTS)
 # -------------------------
-for m in meeting["member_analysis"]:
-    db.execute("""
-    INSERT INTO meeting_intelligence VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        version,
-        m["name"],
-        m["involvement_score"],
-        m["time_spoken_seconds"],
-        m["lines_spoken"],
-        m["behavior_type"],
-        json.dumps(m["important_topics"]),
-        m["summary"],
-        meeting["overall_meeting_summary"],
-        json.dumps(meeting["meeting_topics"]),
-        generated_at
-    ))
-
-# -------------------------
-# STORE GIT DATA
-# -------------------------
-for g in git["members"]:
-    s = g["git_scores"]
-    db.execute("""
-    INSERT INTO git_intelligence VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        version,
-        g["name"],
-        s["work_importance"],
-        s["pr_involvement"],
-        s["comment_quality"],
-        s["activity"],
-        s["collaboration_health"],
-        s["git_score"],
-        g["git_behavior"],
-        generated_at
-    ))
-
-# -------------------------
-# STORE FINAL FUSION DATA
-# -------------------------
-for f in final_output["members"]:
-    db.execute("""
-    INSERT INTO final_team_intelligence VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        version,
-        f["name"],
-        f["merged_score"],
-        f["final_behavior"],
-        f["git_score"],
-        f["meeting_score"],
-        generated_at
-    ))
-
-db.close()
+with transaction() as db:
+    version = begin_run(db, "fusion")
+
+    insert_rows(db, "meeting_intelligence", [
+        (
+            version,
+            m["name"],
+            m["involvement_score"],
+            m["time_spoken_seconds"],
+            m["lines_spoken"],
+            m["behavior_type"],
+            json.dumps(m["important_topics"]),
+            m["summary"],
+            meeting["overall_meeting_summary"],
+            json.dumps(meeting["meeting_topics"]),
+            generated_at
+        )
+        for m in meeting["member_analysis"]
+    ])
+
+    insert_rows(db, "git_intelligence", [
+        (
+            version,
+            g["name"],
+            g["git_scores"]["work_importance"],
+            g["git_scores"]["pr_involvement"],
+            g["git_scores"]["comment_quality"],
+            g["git_scores"]["activity"],
+            g["git_scores"]["collaboration_health"],
+            g["git_scores"]["git_score"],
+            g["git_behavior"],
+            generated_at
+        )
+        for g in git["members"]
+    ])
+
+    insert_rows(db, "final_team_intelligence", [
+        (
+            version,
+            f["name"],
+            f["merged_score"],
+            f["final_behavior"],
+            f["git_score"],
+            f["meeting_score"],
+            generated_at
+        )
+        for f in final_output["members"]
+    ])
+
+close_db()
 
 print(f"📦 All intelligence stored in database (version {version})")
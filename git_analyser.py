@@ -1,123 +1,44 @@
-import csv
+import os
+import glob
 import json
-from collections import defaultdict, Counter
+import pandas as pd
 from datetime import datetime
-
-COMMITS_FILE = "github_data/commits.csv"
-PRS_FILE = "github_data/pull_requests.csv"
-REVIEWS_FILE = "github_data/reviews.csv"
+from git_scoring import score_members
+from review_graph import collaboration_scores
+
+DATA_DIR = "github_data"
+# Per-repo partitions written by github_data/multi_repo.py
+PARTITIONS_DIR = os.path.join(DATA_DIR, "repos")
+COMMITS_FILE = "commits.csv"
+PRS_FILE = "pull_requests.csv"
+REVIEWS_FILE = "reviews.csv"
 OUTPUT_FILE = "git_intelligence.json"
 
 # -------------------------
 # LOAD CSV HELPERS
 # -------------------------
-def load_csv(path):
-    with open(path, newline="", encoding="utf-8") as f:
-        return list(csv.DictReader(f))
-
+def load_csv(path, columns):
+    # Raw strings, exactly as csv.DictReader saw them; scoring does its own casts
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
 
-commits = load_csv(COMMITS_FILE)
-prs = load_csv(PRS_FILE)
-reviews = load_csv(REVIEWS_FILE)
 
-# -------------------------
-# DATA AGGREGATION
-# -------------------------
-people = defaultdict(lambda: {
-    "commits": [],
-    "prs": [],
-    "reviews": [],
-    "blocked": 0
-})
+def load_dataset(filename, columns):
+    """One dataset across every repo partition, or the single-repo export if there are none."""
+    paths = sorted(glob.glob(os.path.join(PARTITIONS_DIR, "*", filename)))
+    if not paths:
+        paths = [os.path.join(DATA_DIR, filename)]
 
-for c in commits:
-    people[c["user"]]["commits"].append(c)
+    return pd.concat([load_csv(path, columns) for path in paths], ignore_index=True)
 
-for p in prs:
-    people[p["user"]]["prs"].append(p)
-    if p["merged"] == "False":
-        people[p["user"]]["blocked"] += 1
 
-for r in reviews:
-    people[r["reviewer"]]["reviews"].append(r)
+commits = load_dataset(COMMITS_FILE, ["user", "core_files", "files_changed", "total_changes"])
+prs = load_dataset(PRS_FILE, ["user", "merged"])
+reviews = load_dataset(REVIEWS_FILE, ["reviewer", "state"])
 
 # -------------------------
-# SCORING ENGINE
+# SCORING ENGINE (COLUMNAR)
 # -------------------------
-final_people = []
-
-max_commits = max(len(p["commits"]) for p in people.values())
-max_prs = max(len(p["prs"]) for p in people.values())
-max_reviews = max(len(p["reviews"]) for p in people.values())
-
-for user, data in people.items():
-
-    # 1. WORK IMPORTANCE
-    importance = 0
-    for c in data["commits"]:
-        importance += int(c["core_files"]) * 3
-        importance += int(c["files_changed"])
-        importance += min(10, int(c["total_changes"]) / 40)
-
-    work_importance = min(100, importance)
-
-    # 2. PR INVOLVEMENT
-    pr_involvement = (len(data["prs"]) / max_prs) * 100 if max_prs else 0
-
-    # 3. COMMENT QUALITY
-    approvals = sum(1 for r in data["reviews"] if r["state"] == "APPROVED")
-    changes = sum(1 for r in data["reviews"] if r["state"] == "CHANGES_REQUESTED")
-
-    comment_quality = min(100, approvals * 20 + changes * 10)
-
-    # 4. ACTIVITY SCORE
-    activity = (len(data["commits"]) / max_commits) * 100 if max_commits else 0
-
-    # 5. COLLABORATION HEALTH
-    collaboration_health = max(0, 100 - data["blocked"] * 20)
-
-    # FINAL SCORE
-    git_score = round(
-        work_importance * 0.35 +
-        pr_involvement * 0.25 +
-        comment_quality * 0.2 +
-        activity * 0.1 +
-        collaboration_health * 0.1, 1
-    )
-
-    # -------------------------
-    # BEHAVIOR ENGINE
-    # -------------------------
-    if work_importance > 70 and activity < 50:
-        git_behavior = "Silent Architect"
-
-    elif work_importance > 60 and collaboration_health < 50:
-        git_behavior = "Firefighter"
-
-    elif comment_quality > 60 and collaboration_health > 60:
-        git_behavior = "Mentor"
-
-    elif activity > 70 and work_importance < 50:
-        git_behavior = "Noisy Contributor"
-
-    elif pr_involvement > 50 and collaboration_health > 60:
-        git_behavior = "Coordinator"
-
-    else:
-        git_behavior = "Observer"
-
-    final_people.append({
-        "name": user,
-        "git_scores": {
-            "work_importance": round(work_importance, 1),
-            "pr_involvement": round(pr_involvement, 1),
-            "comment_quality": round(comment_quality, 1),
-            "activity": round(activity, 1),
-            "collaboration_health": round(collaboration_health, 1),
-            "git_score": git_score
-        },
-        "git_behavior": git_behavior
-    })
+final_people = score_members(commits, prs, reviews, collaboration_scores())
 
 # -------------------------
 # SAVE FILE
@@ -135,31 +56,29 @@ print("✅ Git intelligence generated:", OUTPUT_FILE)
 # -------------------------
 # SAVE TO DATABASE (VERSIONED)
 # -------------------------
-from db_engine import get_db, get_next_version
+from db_engine import transaction, insert_rows, begin_run, close_db
 
 print("🗄️ Saving git intelligence to database...")
 
-db = get_db()
-version = get_next_version("git_intelligence")
-
-for member in final_output["members"]:
-    scores = member["git_scores"]
-
-    db.execute("""
-        INSERT INTO git_intelligence VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        version,
-        member["name"],
-        scores["work_importance"],
-        scores["pr_involvement"],
-        scores["comment_quality"],
-        scores["activity"],
-        scores["collaboration_health"],
-        scores["git_score"],
-        member["git_behavior"],
-        final_output["generated_at"]
-    ))
-
-db.close()
+with transaction() as db:
+    version = begin_run(db, "git_analyser")
+
+    insert_rows(db, "git_intelligence", [
+        (
+            version,
+            member["name"],
+            member["git_scores"]["work_importance"],
+            member["git_scores"]["pr_involvement"],
+            member["git_scores"]["comment_quality"],
+            member["git_scores"]["activity"],
+            member["git_scores"]["collaboration_health"],
+            member["git_scores"]["git_score"],
+            member["git_behavior"],
+            final_output["generated_at"]
+        )
+        for member in final_output["members"]
+    ])
+
+close_db()
 
 print(f"✅ Stored git intelligence as version v{version}")
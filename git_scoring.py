@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# COLUMNAR GIT SCORING ENGINE
+# -------------------------
+# Same formulas as the original per-user loop in git_analyser.py, computed as
+# group-by aggregations over whole columns instead of per-commit Python code.
+# Only the work-importance sum runs per user (not per commit), to keep its
+# floating-point rounding identical to the loop.
+
+# The review network (review_graph.py) adds a bonus to collaboration_health:
+# collaboration (0-100) x this weight of the gap to 100. It can only raise the
+# score; people outside the network get no bonus.
+COLLABORATION_WEIGHT = 0.5
+
+BEHAVIORS = ["Silent Architect", "Firefighter", "Mentor", "Noisy Contributor", "Coordinator"]
+
+
+def count_by(keys, users, mask=None):
+    if mask is not None:
+        keys = keys[mask]
+    return keys.value_counts().reindex(users, fill_value=0).to_numpy()
+
+
+def score_members(commits, prs, reviews, collaboration=None):
+    """Score every user in one pass. Inputs are the raw CSV columns as strings
+    (commits: user, core_files, files_changed, total_changes; prs: user, merged;
+    reviews: reviewer, state), plus an optional name -> 0-100 collaboration
+    Series from review_graph.py. Returns member dicts in first-seen order."""
+
+    # Users in the order the loop version first met them: commit authors, PR authors, reviewers
+    users = pd.Index(pd.unique(pd.concat(
+        [commits["user"], prs["user"], reviews["reviewer"]], ignore_index=True
+    )))
+
+    n_commits = count_by(commits["user"], users)
+    n_prs = count_by(prs["user"], users)
+    blocked = count_by(prs["user"], users, prs["merged"] == "False")
+
+    max_commits = n_commits.max()
+    max_prs = n_prs.max()
+
+    # 1. WORK IMPORTANCE: sum(core*3 + files + min(10, total/40)), capped at 100
+    core = commits["core_files"].astype(np.int64).to_numpy()
+    files = commits["files_changed"].astype(np.int64).to_numpy()
+    total = commits["total_changes"].astype(np.int64).to_numpy()
+    terms = np.column_stack([core * 3, files, np.minimum(10, total / 40)])
+
+    importance = np.zeros(len(users))
+    codes = users.get_indexer(commits["user"])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(users) + 1))
+    flat = terms[order].ravel()
+    for i in np.flatnonzero(n_commits):
+        # cumsum adds strictly left to right, so the float result is bit-for-bit the old += loop
+        importance[i] = np.cumsum(flat[bounds[i] * 3:bounds[i + 1] * 3])[-1]
+
+    work_importance = np.minimum(100, importance)
+
+    # 2. PR INVOLVEMENT
+    pr_involvement = (n_prs / max_prs) * 100 if max_prs else np.zeros(len(users))
+
+    # 3. COMMENT QUALITY
+    approvals = count_by(reviews["reviewer"], users, reviews["state"] == "APPROVED")
+    changes = count_by(reviews["reviewer"], users, reviews["state"] == "CHANGES_REQUESTED")
+    comment_quality = np.minimum(100, approvals * 20 + changes * 10)
+
+    # 4. ACTIVITY SCORE
+    activity = (n_commits / max_commits) * 100 if max_commits else np.zeros(len(users))
+
+    # 5. COLLABORATION HEALTH
+    collaboration_health = np.maximum(0, 100 - blocked * 20)
+
+    in_network = np.zeros(len(users), dtype=bool)
+    if collaboration is not None:
+        signal = collaboration.reindex(users).to_numpy(dtype=float)
+        in_network = ~np.isnan(signal)
+        collaboration_health = collaboration_health + (100 - collaboration_health) * (
+            np.nan_to_num(signal) * COLLABORATION_WEIGHT / 100
+        )
+
+    # FINAL SCORE
+    git_score = (
+        work_importance * 0.35 +
+        pr_involvement * 0.25 +
+        comment_quality * 0.2 +
+        activity * 0.1 +
+        collaboration_health * 0.1
+    )
+
+    # -------------------------
+    # BEHAVIOR ENGINE
+    # -------------------------
+    git_behavior = np.select([
+        (work_importance > 70) & (activity < 50),
+        (work_importance > 60) & (collaboration_health < 50),
+        (comment_quality > 60) & (collaboration_health > 60),
+        (activity > 70) & (work_importance < 50),
+        (pr_involvement > 50) & (collaboration_health > 60),
+    ], BEHAVIORS, default="Observer")
+
+    members = []
+    for i, user in enumerate(users):
+        members.append({
+            "name": user,
+            "git_scores": {
+                "work_importance": round(float(work_importance[i]), 1),
+                "pr_involvement": round(float(pr_involvement[i]) if max_prs else 0, 1),
+                "comment_quality": round(int(comment_quality[i]), 1),
+                "activity": round(float(activity[i]) if max_commits else 0, 1),
+                "collaboration_health": round(float(collaboration_health[i]) if in_network[i] else int(collaboration_health[i]), 1),
+                "git_score": round(float(git_score[i]), 1)
+            },
+            "git_behavior": str(git_behavior[i])
+        })
+
+    return members
@@ -0,0 +1,210 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =========================
+# CONFIG
+# =========================
+
+# Point this at a local stub server to run the exporters offline
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+MAX_WORKERS = int(os.environ.get("GITHUB_MAX_WORKERS", "8"))
+
+# Start spreading requests out once the hourly budget drops below this
+LOW_BUDGET = 50
+MAX_RETRIES = 5
+
+# Left out of ETag cache keys: the cursor changes every sync, the resource does not
+ETAG_IGNORED_PARAMS = {"since"}
+
+# =========================
+
+
+def etag_key(url, params):
+    return url + "?" + "&".join(
+        f"{k}={v}" for k, v in sorted((params or {}).items()) if k not in ETAG_IGNORED_PARAMS
+    )
+
+
+class GitHubClient:
+    """Shared keep-alive session + bounded thread pool for the REST API.
+
+    Pacing is driven by the X-RateLimit-* and Retry-After response headers,
+    so there are no fixed sleeps between calls.
+    """
+
+    def __init__(self, token="", api_url=API_URL, max_workers=MAX_WORKERS):
+        self.api_url = api_url.rstrip("/")
+        self.max_workers = max_workers
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+
+        self._lock = threading.Lock()
+        # Per rate-limit budget ("core" for REST, "graphql"), shared by every
+        # thread: earliest time the next request may start, and the spacing
+        # between requests while that budget is low
+        self._budgets = {}
+        self.remaining = {}
+        self.requests_made = 0
+
+    # ---------- RATE LIMIT PACING ----------
+
+    def _budget(self, resource):
+        # Call with self._lock held
+        return self._budgets.setdefault(resource, {"resume_at": 0.0, "interval": 0.0})
+
+    def _wait_for_budget(self, resource):
+        # Each request takes its own slot, one interval after the previous one,
+        # so threads waiting out a pause leave one at a time instead of together
+        with self._lock:
+            budget = self._budget(resource)
+            now = time.time()
+            slot = max(now, budget["resume_at"])
+            budget["resume_at"] = slot + budget["interval"]
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _pause(self, resource, seconds):
+        with self._lock:
+            budget = self._budget(resource)
+            budget["resume_at"] = max(budget["resume_at"], time.time() + seconds)
+
+    def _read_budget(self, r, resource):
+        """Update pacing from response headers. Returns True if the call must be retried."""
+        # REST and GraphQL have separate budgets; GitHub names the one a reply counts against
+        resource = r.headers.get("X-RateLimit-Resource", resource)
+        remaining = r.headers.get("X-RateLimit-Remaining")
+        reset = r.headers.get("X-RateLimit-Reset")
+        retry_after = r.headers.get("Retry-After")
+
+        if remaining is not None:
+            with self._lock:
+                self.remaining[resource] = int(remaining)
+
+        if r.status_code in (403, 429):
+            if retry_after is not None:
+                self._pause(resource, float(retry_after))
+                return True
+            if remaining == "0" and reset is not None:
+                self._pause(resource, max(0.0, float(reset) - time.time()) + 1)
+                return True
+            return False
+
+        # Spread what is left of the budget evenly until the window resets
+        if remaining is not None and reset is not None:
+            interval = 0.0
+            if int(remaining) < LOW_BUDGET:
+                interval = max(0.0, float(reset) - time.time()) / max(int(remaining), 1)
+            with self._lock:
+                self._budget(resource)["interval"] = interval
+
+        return False
+
+    # ---------- REQUESTS ----------
+
+    def url(self, path):
+        if path.startswith("http"):
+            return path
+        return self.api_url + path
+
+    def resource(self, path):
+        """The rate-limit budget a call to path is expected to count against."""
+        return "graphql" if self.url(path).rstrip("/").endswith("/graphql") else "core"
+
+    def request(self, method, path, **kwargs):
+        r = None
+        resource = self.resource(path)
+        for _ in range(MAX_RETRIES):
+            self._wait_for_budget(resource)
+            r = self.session.request(method, self.url(path), timeout=30, **kwargs)
+            with self._lock:
+                self.requests_made += 1
+            if not self._read_budget(r, resource):
+                return r
+        return r
+
+    def get_json(self, path, params=None, etags=None):
+        """GET a JSON document.
+
+        When an `etags` dict is passed the request is made conditional on the
+        ETag stored for this URL; an unchanged resource (304, which does not
+        count against the rate limit) returns None.
+        """
+        if etags is None:
+            return self.request("GET", path, params=params).json()
+
+        key = etag_key(self.url(path), params)
+        headers = {}
+        if key in etags:
+            headers["If-None-Match"] = etags[key]
+
+        r = self.request("GET", path, params=params, headers=headers)
+        if r.status_code == 304:
+            return None
+        if r.headers.get("ETag"):
+            etags[key] = r.headers["ETag"]
+        return r.json()
+
+    def get_pages(self, path, params=None, max_pages=2, etags=None, stop=None):
+        """Fetch page 1, then pages 2..max_pages concurrently, keeping results up to the first empty page.
+
+        With `stop` (or max_pages=None) pages are fetched one after another
+        instead, until a page holds an item for which stop(item) is true, an
+        empty page, or max_pages.
+
+        With `etags`, page 1 is fetched conditionally and None is returned when
+        it is unchanged since the last run.
+        """
+        params = dict(params or {})
+
+        first = self.get_json(path, params={**params, "page": 1}, etags=etags)
+        if first is None:
+            return None
+
+        if stop is not None or max_pages is None:
+            return self._pages_until(path, params, first, max_pages, stop)
+
+        def fetch(page):
+            return self.get_json(path, params={**params, "page": page})
+
+        pages = [first]
+        if first and "message" not in first:
+            pages += self.map(fetch, range(2, max_pages + 1))
+
+        results = []
+        for data in pages:
+            if not data or "message" in data:
+                break
+            results.extend(data)
+        return results
+
+    def _pages_until(self, path, params, data, max_pages, stop):
+        results = []
+        page = 1
+        while data and "message" not in data:
+            results.extend(data)
+            if (stop is not None and any(stop(item) for item in data)) or (max_pages and page >= max_pages):
+                break
+            page += 1
+            data = self.get_json(path, params={**params, "page": page})
+        return results
+
+    def map(self, fn, items):
+        """Run fn over items on the shared pool, preserving input order."""
+        return list(self.pool.map(fn, items))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.session.close()
@@ -1,6 +1,10 @@
-import requests
+import os
+import sys
 import pandas as pd
-import time
+from datetime import date
+
+from gh_client import GitHubClient
+from sync_state import SyncState
 
 # =========================
 # CONFIG (CHANGE ONLY THESE)
@@ -10,135 +14,339 @@ TOKEN = ""
 OWNER = "fastapi"
 REPO = "fastapi"
 
-# =========================
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}"
-}
-
-BASE = f"https://api.github.com/repos/{OWNER}/{REPO}"
-
-def get_all_pages(url, max_pages=2):
-    results = []
-    for page in range(1, max_pages + 1):
-        r = requests.get(url + f"&page={page}", headers=HEADERS)
-        data = r.json()
-        if not data or "message" in data:
-            break
-        results.extend(data)
-        time.sleep(0.6)
-    return results
-
+# Per run. The first sync starts from the newest MAX_COMMITS / MAX_PRS; after
+# that every new item is exported, oldest first, over as many runs as it takes
+MAX_COMMITS = 120
+MAX_PRS = 80
+FIRST_SYNC_PAGES = 2
 
-# =========================
-# CONTRIBUTORS
-# =========================
+# Pass --full to ignore the saved cursors and re-export from page 1
+FULL_RESYNC = "--full" in sys.argv
 
-print("Fetching contributors...")
-contributors = get_all_pages(BASE + "/contributors?per_page=100", max_pages=2)
-pd.json_normalize(contributors).to_csv("contributors.csv", index=False)
+# Each run's rows are also appended as Parquet under
+# data_lake/<dataset>/repo=<owner>__<repo>/date=<sync date>/ (see warehouse.py --from-parquet)
+PARQUET_DIR = "data_lake"
+WRITE_PARQUET = True
 
-
-# =========================
-# COMMITS
 # =========================
 
-print("Fetching commits...")
-commits = get_all_pages(BASE + "/commits?per_page=100", max_pages=2)
 
-commit_rows = []
+def upsert_csv(path, rows, key, replace=None):
+    """Write rows into path, replacing existing rows whose `key` is in `replace`
+    (defaults to the keys of the new rows). Older rows are kept after the new ones."""
+    if replace is None:
+        replace = {r[key] for r in rows}
+    if not rows and not replace:
+        return
 
-for c in commits[:120]:
-    if c.get("author"):
-        sha = c["sha"]
-        detail = requests.get(BASE + "/commits/" + sha, headers=HEADERS).json()
+    new = pd.DataFrame(rows)
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        try:
+            old = pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            # A run that exported no rows leaves a file without a header
+            old = pd.DataFrame()
+        if key in old.columns:
+            new = pd.concat([new, old[~old[key].isin(replace)]], ignore_index=True)
+    new.to_csv(path, index=False)
 
-        files = detail.get("files", [])
-        core_files = [f["filename"] for f in files if "core" in f["filename"].lower()]
-
-        commit_rows.append({
-            "user": c["author"]["login"],
-            "sha": sha,
-            "files_changed": len(files),
-            "core_files": len(core_files),
-            "additions": detail.get("stats", {}).get("additions", 0),
-            "deletions": detail.get("stats", {}).get("deletions", 0),
-            "total_changes": detail.get("stats", {}).get("total", 0)
-        })
 
-        time.sleep(0.6)
+def write_csv(path, rows, key, incremental, replace=None):
+    if incremental:
+        upsert_csv(path, rows, key, replace)
+    else:
+        pd.DataFrame(rows).to_csv(path, index=False)
 
-pd.DataFrame(commit_rows).to_csv("commits.csv", index=False)
 
+def write_parquet(dataset, rows, repo_path):
+    """Append this run's rows for one repo as a Parquet file, partitioned by repo and sync date."""
+    if not WRITE_PARQUET or not rows:
+        return
 
-# =========================
-# PULL REQUESTS + REVIEWS
-# =========================
+    df = pd.DataFrame(rows)
+    # Keep text columns typed as strings even when a run only saw nulls, so partitions share a schema
+    df = df.astype({c: "string" for c in df.columns if df[c].dtype == object})
+    df["synced_at"] = pd.Timestamp.now()
+    df["repo"] = "__".join(repo_path.split("/")[2:4])
+    df["date"] = date.today().isoformat()
 
-print("Fetching pull requests...")
-prs = get_all_pages(BASE + "/pulls?state=all&per_page=100", max_pages=2)
+    df.to_parquet(os.path.join(PARQUET_DIR, dataset), partition_cols=["repo", "date"], index=False)
 
-pr_rows = []
-review_rows = []
 
-for pr in prs[:80]:
-    pr_rows.append({
-        "number": pr.get("number"),
-        "user": pr.get("user", {}).get("login"),
-        "merged": pr.get("merged_at") is not None,
-        "comments": pr.get("comments", 0),
-        "title": pr.get("title", ""),
-        "created_at": pr.get("created_at"),
-        "merged_at": pr.get("merged_at")
-    })
+def commit_row(client, repo_path, c):
+    """The commit's row for commits.csv and one row per changed file for commit_files.csv."""
+    sha = c["sha"]
+    detail = client.get_json(f"{repo_path}/commits/{sha}")
 
-    reviews = requests.get(
-        BASE + f"/pulls/{pr.get('number')}/reviews",
-        headers=HEADERS
-    ).json()
+    files = detail.get("files", [])
+    core_files = [f["filename"] for f in files if "core" in f["filename"].lower()]
 
+    file_rows = [
+        {
+            "sha": sha,
+            "user": c["author"]["login"],
+            "path": f["filename"],
+            "additions": f.get("additions", 0),
+            "deletions": f.get("deletions", 0),
+            "changes": f.get("changes", 0)
+        }
+        for f in files
+    ]
+
+    return {
+        "user": c["author"]["login"],
+        "sha": sha,
+        "files_changed": len(files),
+        "core_files": len(core_files),
+        "additions": detail.get("stats", {}).get("additions", 0),
+        "deletions": detail.get("stats", {}).get("deletions", 0),
+        "total_changes": detail.get("stats", {}).get("total", 0)
+    }, file_rows
+
+
+def pr_reviews(client, repo_path, pr):
+    reviews = client.get_json(f"{repo_path}/pulls/{pr.get('number')}/reviews")
+
+    rows = []
     if isinstance(reviews, list):
         for r in reviews:
-            review_rows.append({
+            rows.append({
                 "pr_number": pr.get("number"),
                 "reviewer": r.get("user", {}).get("login"),
                 "state": r.get("state")
             })
+    return rows
+
+
+def export_contributors(client, repo_path, state, out_dir="."):
+    print("Fetching contributors...")
+    contributors = client.get_pages(f"{repo_path}/contributors", {"per_page": 100}, max_pages=2, etags=state["etags"])
+    if contributors is None:
+        print("  unchanged")
+        return
+
+    pd.json_normalize(contributors).to_csv(os.path.join(out_dir, "contributors.csv"), index=False)
+
+
+def backfill_commit_files(client, repo_path, state, out_dir="."):
+    """Fetch file lists for commits exported before commit_files.csv existed, MAX_COMMITS per run."""
+    commits_path = os.path.join(out_dir, "commits.csv")
+    files_path = os.path.join(out_dir, "commit_files.csv")
+
+    if state["files_backfill"] is None:
+        missing = []
+        if state["last_sha"] and os.path.exists(commits_path):
+            commits = pd.read_csv(commits_path, usecols=["sha", "user"])
+            have = set()
+            if os.path.exists(files_path) and os.path.getsize(files_path) > 0:
+                have = set(pd.read_csv(files_path, usecols=["sha"])["sha"])
+            missing = commits.loc[~commits["sha"].isin(have), ["sha", "user"]].values.tolist()
+        state["files_backfill"] = missing
+
+    batch = state["files_backfill"][:MAX_COMMITS]
+    if not batch:
+        return
+
+    print("Backfilling commit file lists...")
+    results = client.map(
+        lambda c: commit_row(client, repo_path, {"sha": c[0], "author": {"login": c[1]}}),
+        batch
+    )
+    file_rows = [f for _, files in results for f in files]
+
+    upsert_csv(files_path, file_rows, "sha", replace={sha for sha, _ in batch})
+    write_parquet("commit_files", file_rows, repo_path)
+
+    state["files_backfill"] = state["files_backfill"][len(batch):]
+    print(f"  {len(batch)} commits backfilled ({len(state['files_backfill'])} left for the next run)")
+
+
+def export_commits(client, repo_path, state, out_dir="."):
+    backfill_commit_files(client, repo_path, state, out_dir)
+
+    print("Fetching commits...")
+    params = {"per_page": 100}
+    if state["commits_since"]:
+        params["since"] = state["commits_since"]
+
+    # Page back until the last SHA we saw (or, on the first sync, FIRST_SYNC_PAGES)
+    last_sha = state["last_sha"]
+    commits = client.get_pages(
+        f"{repo_path}/commits", params,
+        max_pages=None if last_sha else FIRST_SYNC_PAGES,
+        etags=None if state["commits_pending"] else state["etags"],
+        stop=lambda c: c["sha"] == last_sha
+    )
+    if commits is None:
+        print("  unchanged")
+        return
+
+    # Newest first: everything before the last SHA we saw is new
+    new_commits = []
+    for c in commits:
+        if c["sha"] == last_sha:
+            break
+        new_commits.append(c)
+
+    if last_sha is None:
+        new_commits = new_commits[:MAX_COMMITS]
+    # The oldest MAX_COMMITS; the cursor only moves past what is exported here
+    batch = new_commits[-MAX_COMMITS:]
+    state["commits_pending"] = len(batch) < len(new_commits)
+
+    results = client.map(
+        lambda c: commit_row(client, repo_path, c),
+        [c for c in batch if c.get("author")]
+    )
+    commit_rows = [row for row, _ in results]
+    file_rows = [f for _, files in results for f in files]
+
+    incremental = last_sha is not None
+    write_csv(os.path.join(out_dir, "commits.csv"), commit_rows, "sha", incremental=incremental)
+    write_csv(
+        os.path.join(out_dir, "commit_files.csv"), file_rows, "sha",
+        incremental=incremental,
+        replace={row["sha"] for row in commit_rows}
+    )
+    write_parquet("commits", commit_rows, repo_path)
+    write_parquet("commit_files", file_rows, repo_path)
+
+    if batch:
+        state["last_sha"] = batch[0]["sha"]
+        state["commits_since"] = (
+            batch[0].get("commit", {}).get("committer", {}).get("date")
+            or state["commits_since"]
+        )
+    print(f"  {len(commit_rows)} new commits"
+          + (f" ({len(new_commits) - len(batch)} left for the next run)" if state["commits_pending"] else ""))
+
+
+def export_pull_requests(client, repo_path, state, out_dir="."):
+    print("Fetching pull requests...")
+    # Most recently updated first: page back until the cursor (or FIRST_SYNC_PAGES on the first sync)
+    prs_since = state["prs_since"]
+    prs = client.get_pages(
+        f"{repo_path}/pulls",
+        {"state": "all", "sort": "updated", "direction": "desc", "per_page": 100},
+        max_pages=None if prs_since else FIRST_SYNC_PAGES,
+        etags=None if state["prs_pending"] else state["etags"],
+        stop=lambda pr: prs_since is not None and (pr.get("updated_at") or "") < prs_since
+    )
+    if prs is None:
+        print("  unchanged")
+        return
+
+    # >= so PRs sharing the cursor's timestamp are never skipped; rows are upserted by number
+    if prs_since:
+        prs = [pr for pr in prs if (pr.get("updated_at") or "") >= prs_since]
+        # The oldest MAX_PRS; the cursor only moves past what is exported here
+        state["prs_pending"] = len(prs) > MAX_PRS
+        prs = prs[-MAX_PRS:]
+    else:
+        prs = prs[:MAX_PRS]
+
+    pr_rows = []
+    for pr in prs:
+        pr_rows.append({
+            "number": pr.get("number"),
+            "user": pr.get("user", {}).get("login"),
+            "merged": pr.get("merged_at") is not None,
+            "comments": pr.get("comments", 0),
+            "title": pr.get("title", ""),
+            "created_at": pr.get("created_at"),
+            "merged_at": pr.get("merged_at")
+        })
+
+    # Reviews are only re-fetched for PRs that changed since the last run
+    review_rows = []
+    for rows in client.map(lambda pr: pr_reviews(client, repo_path, pr), prs):
+        review_rows.extend(rows)
+
+    write_csv(os.path.join(out_dir, "pull_requests.csv"), pr_rows, "number", incremental=prs_since is not None)
+    write_csv(
+        os.path.join(out_dir, "reviews.csv"), review_rows, "pr_number",
+        incremental=prs_since is not None,
+        replace={pr.get("number") for pr in prs}
+    )
+    write_parquet("pull_requests", pr_rows, repo_path)
+    write_parquet("reviews", review_rows, repo_path)
+
+    if prs:
+        state["prs_since"] = max(pr.get("updated_at") or "" for pr in prs) or prs_since
+    print(f"  {len(pr_rows)} new/updated pull requests, {len(review_rows)} reviews")
+
+
+def export_issues(client, repo_path, state, out_dir="."):
+    print("Fetching issues...")
+    params = {"state": "all", "per_page": 100}
+    if state["issues_since"]:
+        params["since"] = state["issues_since"]
+
+    # `since` bounds the listing, so every page of it is read
+    issues = client.get_pages(
+        f"{repo_path}/issues", params,
+        max_pages=None if state["issues_since"] else FIRST_SYNC_PAGES,
+        etags=state["etags"]
+    )
+    if issues is None:
+        print("  unchanged")
+        return
+
+    issue_rows = []
+
+    for i in issues:
+        if "pull_request" not in i:
+            issue_rows.append({
+                "number": i.get("number"),
+                "user": i.get("user", {}).get("login"),
+                "closed": i.get("closed_at") is not None,
+                "comments": i.get("comments", 0),
+                "title": i.get("title", ""),
+                "created_at": i.get("created_at"),
+                "closed_at": i.get("closed_at")
+            })
 
-    time.sleep(0.6)
+    write_csv(os.path.join(out_dir, "issues.csv"), issue_rows, "number", incremental=state["issues_since"] is not None)
+    write_parquet("issues", issue_rows, repo_path)
 
-pd.DataFrame(pr_rows).to_csv("pull_requests.csv", index=False)
-pd.DataFrame(review_rows).to_csv("reviews.csv", index=False)
+    if issues:
+        state["issues_since"] = max(i.get("updated_at") or "" for i in issues) or state["issues_since"]
+    print(f"  {len(issue_rows)} new/updated issues")
 
 
-# =========================
-# ISSUES
-# =========================
+def export_repo(client, owner, repo, state, out_dir="."):
+    """Export one repository into out_dir, pulling only what changed since the cursors in `state`.
 
-print("Fetching issues...")
-issues = get_all_pages(BASE + "/issues?state=all&per_page=100", max_pages=2)
+    A 304 on a listing means nothing changed there, so that dataset is left as is.
+    """
+    repo_path = f"/repos/{owner}/{repo}"
+    os.makedirs(out_dir, exist_ok=True)
 
-issue_rows = []
+    export_contributors(client, repo_path, state, out_dir)
+    export_commits(client, repo_path, state, out_dir)
+    export_pull_requests(client, repo_path, state, out_dir)
+    export_issues(client, repo_path, state, out_dir)
 
-for i in issues:
-    if "pull_request" not in i:
-        issue_rows.append({
-            "user": i.get("user", {}).get("login"),
-            "closed": i.get("closed_at") is not None,
-            "comments": i.get("comments", 0),
-            "title": i.get("title", ""),
-            "created_at": i.get("created_at"),
-            "closed_at": i.get("closed_at")
-        })
 
-pd.DataFrame(issue_rows).to_csv("issues.csv", index=False)
+if __name__ == "__main__":
+    sync = SyncState()
+    state = sync.reset(OWNER, REPO) if FULL_RESYNC else sync.repo(OWNER, REPO)
 
+    client = GitHubClient(TOKEN)
+    try:
+        export_repo(client, OWNER, REPO, state)
+    finally:
+        client.close()
 
-# =========================
-print("\nDONE ✅")
-print("Files created:")
-print("contributors.csv")
-print("commits.csv")
-print("pull_requests.csv")
-print("reviews.csv")
-print("issues.csv")
+    # Cursors only move forward once every dataset has been written
+    sync.save()
+
+    # =========================
+    print("\nDONE ✅")
+    print(f"Files updated ({client.requests_made} API calls):")
+    print("contributors.csv")
+    print("commits.csv")
+    print("commit_files.csv")
+    print("pull_requests.csv")
+    print("reviews.csv")
+    print("issues.csv")
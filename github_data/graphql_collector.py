@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime, timezone
+
+from gh_client import GitHubClient
+
+# =========================
+# CONFIG (CHANGE ONLY THESE)
+# =========================
+
+TOKEN = ""
+REPOS = ["fastapi/fastapi"]
+
+PAGE_SIZE = 50
+# Batched pages per run (PAGE_SIZE newest commits / PRs / issues each). The
+# outputs are rewritten every run, so this is the window the daily job keeps;
+# --all-pages (or --max-pages=N) to crawl deeper, e.g. for a one-off backfill
+MAX_PAGES = 4
+
+# Pause when the remaining point budget can't cover this many more pages
+BUDGET_PAGES = 5
+
+# =========================
+
+# alias -> (selection with $<alias>_after cursor, path to the connection under the alias)
+CONNECTIONS = {
+    "commits": ("""
+    commits: defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: %(page)d, after: $commits_after) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              committedDate
+              author {
+                user {
+                  login
+                }
+              }
+              additions
+              deletions
+              changedFiles
+              messageHeadline
+            }
+          }
+        }
+      }
+    }""", ["target", "history"]),
+
+    "prs": ("""
+    prs: pullRequests(first: %(page)d, after: $prs_after, states: MERGED, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        createdAt
+        mergedAt
+        author {
+          login
+        }
+        reviews(first: 20) {
+          nodes {
+            id
+            state
+            createdAt
+            author {
+              login
+            }
+          }
+        }
+        commits(last: 1) {
+          nodes {
+            commit {
+              additions
+              deletions
+              changedFiles
+            }
+          }
+        }
+      }
+    }""", []),
+
+    "issues": ("""
+    issues: issues(first: %(page)d, after: $issues_after, states: CLOSED, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        createdAt
+        closedAt
+        author {
+          login
+        }
+        assignees(first: 5) {
+          nodes {
+            login
+          }
+        }
+        comments {
+          totalCount
+        }
+      }
+    }""", []),
+}
+
+# output file -> (alias whose pages it is built from, path of the nodes list in the original file shape)
+# The review network is a projection of the PR pages, so reviews are only fetched once.
+OUTPUTS = {
+    "graphql_commit_intelligence.json": ("commits", ["repository", "defaultBranchRef", "target", "history"]),
+    "graphql_pr_intelligence.json": ("prs", ["repository", "pullRequests"]),
+    "graphql_issue_intelligence.json": ("issues", ["repository", "issues"]),
+    "graphql_review_network.json": ("prs", ["repository", "pullRequests"]),
+}
+
+
+def build_query(active):
+    variables = ", ".join(f"${alias}_after: String" for alias in active)
+    selections = "".join(CONNECTIONS[alias][0] % {"page": PAGE_SIZE} for alias in active)
+    return f"""
+query($owner: String!, $name: String!, {variables}) {{
+  rateLimit {{ cost remaining resetAt }}
+  repository(owner: $owner, name: $name) {{{selections}
+  }}
+}}
+"""
+
+
+def dig(d, keys):
+    for k in keys:
+        d = (d or {}).get(k)
+    return d
+
+
+class GraphQLCollector:
+    """Batched, paginated collector for one repository.
+
+    Every round sends a single query with one aliased connection per dataset
+    that still has pages left, and appends each page to a JSONL file as soon
+    as it arrives.
+    """
+
+    def __init__(self, client, owner, repo, out_dir="."):
+        self.client = client
+        self.owner = owner
+        self.repo = repo
+        self.out_dir = out_dir
+        self.cost = 0
+        self.remaining = None
+
+    def page_file(self, alias):
+        return os.path.join(self.out_dir, f"{alias}.pages.jsonl")
+
+    def post(self, query, variables):
+        r = self.client.request("POST", "/graphql", json={"query": query, "variables": variables})
+        data = r.json()
+        if data.get("errors"):
+            raise RuntimeError(f"GraphQL error for {self.owner}/{self.repo}: {data['errors']}")
+        return data["data"]
+
+    def track_cost(self, rate):
+        if not rate:
+            return
+        self.cost += rate["cost"]
+        self.remaining = rate["remaining"]
+
+        # Sleep through the reset instead of failing mid-pagination
+        if self.remaining < rate["cost"] * BUDGET_PAGES:
+            reset_at = datetime.strptime(rate["resetAt"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            wait = (reset_at - datetime.now(timezone.utc)).total_seconds()
+            if wait > 0:
+                print(f"  ⏳ GraphQL budget low ({self.remaining} points), waiting {wait:.0f}s")
+                time.sleep(wait + 1)
+
+    def collect(self, max_pages=MAX_PAGES):
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        cursors = {alias: None for alias in CONNECTIONS}
+        files = {alias: open(self.page_file(alias), "w", encoding="utf-8") for alias in CONNECTIONS}
+        pages = 0
+
+        try:
+            while cursors and (max_pages is None or pages < max_pages):
+                active = list(cursors)
+                variables = {"owner": self.owner, "name": self.repo}
+                variables.update({f"{alias}_after": cursors[alias] for alias in active})
+
+                data = self.post(build_query(active), variables)
+                self.track_cost(data.get("rateLimit"))
+                pages += 1
+
+                for alias in active:
+                    conn = dig(data["repository"][alias], CONNECTIONS[alias][1]) or {}
+                    files[alias].write(json.dumps(conn.get("nodes", [])) + "\n")
+                    files[alias].flush()
+
+                    info = conn.get("pageInfo", {})
+                    if info.get("hasNextPage"):
+                        cursors[alias] = info["endCursor"]
+                    else:
+                        del cursors[alias]
+        finally:
+            for f in files.values():
+                f.close()
+
+        self.write_outputs()
+        return pages
+
+    def write_outputs(self):
+        """Assemble the streamed pages into the original graphql_*.json shapes, one node at a time."""
+        for filename, (alias, path) in OUTPUTS.items():
+            with open(os.path.join(self.out_dir, filename), "w", encoding="utf-8") as out, \
+                    open(self.page_file(alias), "r", encoding="utf-8") as pages:
+                out.write("{\"data\": ")
+                for k in path:
+                    out.write("{" + json.dumps(k) + ": ")
+                out.write("{\"nodes\": [")
+
+                first = True
+                for line in pages:
+                    for node in json.loads(line):
+                        out.write(("\n" if first else ",\n") + json.dumps(node))
+                        first = False
+
+                out.write("\n]}" + "}" * len(path) + "}\n")
+
+        for alias in CONNECTIONS:
+            os.remove(self.page_file(alias))
+
+
+def parse_args(argv):
+    repos = [a for a in argv if not a.startswith("--")]
+    max_pages = MAX_PAGES
+    for a in argv:
+        if a.startswith("--max-pages="):
+            max_pages = int(a.split("=", 1)[1])
+        elif a == "--all-pages":
+            # Follow endCursor to the end of history
+            max_pages = None
+    return repos or REPOS, max_pages
+
+
+if __name__ == "__main__":
+    repos, max_pages = parse_args(sys.argv[1:])
+
+    client = GitHubClient(TOKEN)
+    try:
+        for full_name in repos:
+            owner, repo = full_name.split("/")
+            # A single repo keeps writing next to this script, as the old graphql_*.py scripts did
+            out_dir = "." if len(repos) == 1 else os.path.join("repos", f"{owner}__{repo}")
+
+            print(f"Collecting {full_name} via GraphQL...")
+            collector = GraphQLCollector(client, owner, repo, out_dir)
+            pages = collector.collect(max_pages)
+            print(f"  {pages} batched pages, {collector.cost} points used, {collector.remaining} remaining")
+    finally:
+        client.close()
+
+    print("DONE ✅ " + ", ".join(OUTPUTS) + " created")
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gh_client import GitHubClient
+from sync_state import SyncState
+from github_export import export_repo
+from graphql_collector import GraphQLCollector
+
+# =========================
+# CONFIG (CHANGE ONLY THESE)
+# =========================
+
+TOKEN = ""
+REPOS_FILE = "repos.txt"   # one owner/repo per line
+REPOS_DIR = "repos"        # per-repo partitions: repos/<owner>__<repo>/*.csv
+
+REPO_WORKERS = 4           # repositories ingested at the same time
+PER_REPO_WORKERS = 4       # concurrent API calls per repository
+
+WITH_GRAPHQL = "--no-graphql" not in sys.argv
+
+# =========================
+
+
+def partition_dir(full_name):
+    owner, repo = full_name.split("/")
+    return os.path.join(REPOS_DIR, f"{owner}__{repo}")
+
+
+def load_repo_list(argv):
+    repos = [a for a in argv if not a.startswith("--")]
+    if repos:
+        return repos
+
+    with open(REPOS_FILE, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def ingest_repo(client, sync, full_name):
+    owner, repo = full_name.split("/")
+    out_dir = partition_dir(full_name)
+    started = time.time()
+
+    export_repo(client, owner, repo, sync.repo(owner, repo), out_dir)
+    if WITH_GRAPHQL:
+        GraphQLCollector(client, owner, repo, out_dir).collect()
+
+    return time.time() - started
+
+
+def ingest_all(repos, workers=REPO_WORKERS):
+    """Ingest every repository on a thread pool.
+
+    All workers share one GitHubClient, so the rate-limit budget read from the
+    response headers (and any Retry-After pause) applies to the whole run rather
+    than to each repository separately.
+    """
+    sync = SyncState()
+    client = GitHubClient(TOKEN, max_workers=workers * PER_REPO_WORKERS)
+    failed = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(ingest_repo, client, sync, name): name for name in repos}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    print(f"✅ {name} ingested in {future.result():.1f}s")
+                except Exception as e:
+                    failed.append(name)
+                    print(f"❌ {name} failed: {e}")
+    finally:
+        client.close()
+
+    # Cursors of failed repos may be half-advanced, so start those over next time
+    for name in failed:
+        sync.reset(*name.split("/"))
+    sync.save()
+
+    return client.requests_made, failed
+
+
+if __name__ == "__main__":
+    repos = load_repo_list(sys.argv[1:])
+    workers = REPO_WORKERS
+    for a in sys.argv[1:]:
+        if a.startswith("--workers="):
+            workers = int(a.split("=", 1)[1])
+
+    print(f"🚚 Ingesting {len(repos)} repositories with {workers} workers...")
+    started = time.time()
+    calls, failed = ingest_all(repos, workers)
+
+    print(f"\nDONE ✅ {len(repos) - len(failed)}/{len(repos)} repositories in {time.time() - started:.1f}s ({calls} API calls)")
+    print(f"Partitions written under {REPOS_DIR}/")
@@ -0,0 +1,52 @@
+import os
+import json
+
+STATE_FILE = "sync_state.json"
+
+
+def empty_repo_state():
+    return {
+        "last_sha": None,
+        "commits_since": None,
+        "prs_since": None,
+        "issues_since": None,
+        # True while a sync had more new items than it processes per run, so the
+        # next run must not skip the listing on a 304
+        "commits_pending": False,
+        "prs_pending": False,
+        # SHAs in commits.csv still missing from commit_files.csv (commits
+        # exported before file lists were kept); None until first checked
+        "files_backfill": None,
+        "etags": {}
+    }
+
+
+class SyncState:
+    """Persisted cursors (last SHA, `since` timestamps, per-URL ETags) per repository."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.data = {"repos": {}}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def repo(self, owner, repo):
+        state = self.data["repos"].setdefault(f"{owner}/{repo}", empty_repo_state())
+        for key, value in empty_repo_state().items():
+            state.setdefault(key, value)
+        # ETags used to be keyed with the `since` cursor, one new key per sync
+        state["etags"] = {k: v for k, v in state["etags"].items() if "since=" not in k}
+        return state
+
+    def reset(self, owner, repo):
+        self.data["repos"][f"{owner}/{repo}"] = empty_repo_state()
+        return self.data["repos"][f"{owner}/{repo}"]
+
+    def save(self):
+        # Write-then-rename so a crash mid-save never leaves a truncated state file
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
@@ -0,0 +1,67 @@
+from event_store import load_events
+
+# ---------------- ACTOR INDEX ----------------
+# Groups metric events by actor in one pass. Roles (layer 5), explanations
+# (layer 6) and the dashboard (layer 7) all read their per-actor numbers, and
+# the dashboard its per-actor event lists, from here.
+
+HIGH_IMPACT = 7
+LOW_IMPACT = 2
+
+
+def new_stats():
+    return {
+        "total_impact": 0,
+        "event_count": 0,
+        "review_events": 0,
+        "invisible_score": 0,
+        "high_impact_events": 0,
+        "low_impact_events": 0
+    }
+
+
+class ActorIndex:
+    def __init__(self, keep_events=False):
+        """keep_events also buckets the events themselves (needed for dashboard profiles)."""
+        self.stats = {}
+        self.events = {} if keep_events else None
+
+    def add(self, e):
+        stats = self.stats.get(e.actor)
+        if stats is None:
+            stats = self.stats[e.actor] = new_stats()
+            if self.events is not None:
+                self.events[e.actor] = []
+
+        impact = e.metrics.final_impact
+        stats["total_impact"] += impact
+        stats["event_count"] += 1
+
+        if e.event_type == "review":
+            stats["review_events"] += 1
+            stats["invisible_score"] += e.metrics.invisible
+
+        if impact >= HIGH_IMPACT:
+            stats["high_impact_events"] += 1
+        if impact <= LOW_IMPACT:
+            stats["low_impact_events"] += 1
+
+        if self.events is not None:
+            self.events[e.actor].append(e)
+
+    def events_for(self, actor):
+        return self.events.get(actor, [])
+
+    @classmethod
+    def build(cls, events, keep_events=False):
+        index = cls(keep_events)
+        for e in events:
+            index.add(e)
+        return index
+
+
+def load_index(keep_events=False):
+    """Index of the saved metric events; without keep_events only the columns the stats need are read."""
+    if keep_events:
+        return ActorIndex.build(load_events("metric_events"), keep_events=True)
+    return ActorIndex.build(load_events("metric_events", columns=["actor", "event_type", "metrics"]))
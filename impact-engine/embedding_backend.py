@@ -0,0 +1,99 @@
+import os
+import glob
+import uuid
+import hashlib
+import numpy as np
+
+# ---------------- EMBEDDING INTENT BACKEND ----------------
+# Zero-shot intent classification with a small local embedding model served by
+# Ollama (`ollama pull all-minilm`). Texts are embedded in batches and compared
+# by cosine similarity against one prototype vector per intent. Embeddings are
+# cached on disk by text hash, so unchanged commit messages and review bodies
+# are only ever embedded once per model.
+
+EMBED_MODEL = os.environ.get("IMPACT_EMBED_MODEL", "all-minilm")
+CACHE_DIR = ".embedding_cache"
+BATCH_SIZE = 256
+# Below this similarity to every prototype, the intent is "other"
+MIN_SIMILARITY = 0.3
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Vectors by text hash. Each write adds one .npz shard, so a run never rewrites the whole cache."""
+
+    def __init__(self, model, cache_dir=CACHE_DIR):
+        self.dir = os.path.join(cache_dir, model.replace("/", "_").replace(":", "_"))
+        self.vectors = {}
+
+        for path in sorted(glob.glob(os.path.join(self.dir, "*.npz"))):
+            with np.load(path) as shard:
+                self.vectors.update(zip(shard["keys"].tolist(), shard["vectors"]))
+
+    def put_many(self, keys, vectors):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = os.path.join(self.dir, f"{uuid.uuid4().hex}.tmp.npz")
+        np.savez(tmp, keys=np.array(keys), vectors=vectors)
+        os.replace(tmp, tmp.replace(".tmp.npz", ".npz"))
+        self.vectors.update(zip(keys, vectors))
+
+
+class EmbeddingClassifier:
+    def __init__(self, examples, model=EMBED_MODEL, batch_size=BATCH_SIZE, min_similarity=MIN_SIMILARITY):
+        """examples maps each intent to a few texts that typify it, in priority order."""
+        import ollama
+
+        self.ollama = ollama
+        self.model = model
+        self.batch_size = batch_size
+        self.min_similarity = min_similarity
+        self.cache = EmbeddingCache(model)
+
+        self.intents = list(examples)
+        self.prototypes = np.stack([
+            self.normalise(self.embed(texts).mean(axis=0, keepdims=True))[0]
+            for texts in examples.values()
+        ])
+
+    @staticmethod
+    def normalise(vectors):
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def embed(self, texts):
+        """Unit vectors for texts, one row each. Only texts missing from the cache reach the model."""
+        keys = [text_key(t) for t in texts]
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.cache.vectors:
+                missing.setdefault(key, text)
+
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch = missing_keys[start:start + self.batch_size]
+            response = self.ollama.embed(model=self.model, input=[missing[k] for k in batch])
+            vectors = np.asarray(response["embeddings"], dtype=np.float32)
+            self.cache.put_many(batch, self.normalise(vectors))
+
+        return np.stack([self.cache.vectors[k] for k in keys])
+
+    def classify(self, texts):
+        """Best-matching intent per text, "other" for blank texts and weak matches."""
+        intents = ["other"] * len(texts)
+
+        rows = [i for i, t in enumerate(texts) if t.strip()]
+        if not rows:
+            return intents
+
+        similarity = self.embed([texts[i] for i in rows]) @ self.prototypes.T
+        best = similarity.argmax(axis=1)
+        score = similarity.max(axis=1)
+
+        for i, b, s in zip(rows, best, score):
+            if s >= self.min_similarity:
+                intents[i] = self.intents[b]
+        return intents
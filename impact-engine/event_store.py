@@ -0,0 +1,193 @@
+import os
+import json
+import shutil
+from events import Event
+
+# ---------------- EVENT STORAGE ----------------
+# Where each layer's events live. "json" keeps the original <name>.json files;
+# "parquet" writes a dataset under event_lake/<name>/repo=<repo>/month=<YYYY-MM>/,
+# so readers can load only the columns (and partitions) they need. Months rather
+# than days keep the file count down on long histories.
+
+STORAGE = os.environ.get("IMPACT_STORAGE", "json")
+REPO = os.environ.get("IMPACT_REPO", "fastapi__fastapi")
+LAKE_DIR = "event_lake"
+
+# Per-event-type shapes differ, so metadata is kept as a JSON string column
+JSON_COLUMNS = ["metadata"]
+PARTITION_COLUMNS = ["repo", "month"]
+# Original position of each event, so reads come back in the order they were written
+ORDER_COLUMN = "seq"
+# Events buffered per Parquet write
+BATCH_SIZE = 10000
+
+
+def dataset_dir(name):
+    return os.path.join(LAKE_DIR, name)
+
+
+def event_month(e):
+    ts = e.get("timestamp") or ""
+    return ts[:7] if len(ts) >= 7 else "unknown"
+
+
+class EventWriter:
+    """Streams one layer's events to storage as they are produced, replacing
+    any previous output of that layer. Memory use is one batch, not the layer."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.batch = []
+        self.batches = 0
+
+        if STORAGE == "parquet":
+            self.path = dataset_dir(name)
+            if os.path.exists(self.path):
+                shutil.rmtree(self.path)
+        else:
+            self.file = open(f"{name}.json", "w", encoding="utf-8")
+
+    def write(self, event):
+        e = event.to_dict()
+        if STORAGE == "parquet":
+            row = e
+            for col in JSON_COLUMNS:
+                if col in row:
+                    row[col] = json.dumps(row[col])
+            row[ORDER_COLUMN] = self.count
+            row["repo"] = REPO
+            row["month"] = event_month(e)
+            self.batch.append(row)
+            if len(self.batch) >= BATCH_SIZE:
+                self.flush()
+        else:
+            # Same bytes as json.dump(events, f, indent=2) of the whole list
+            item = json.dumps(e, indent=2).replace("\n", "\n  ")
+            self.file.write(("[\n  " if self.count == 0 else ",\n  ") + item)
+        self.count += 1
+
+    def flush(self):
+        if not self.batch:
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_to_dataset(
+            pa.Table.from_pylist(self.batch), self.path,
+            partition_cols=PARTITION_COLUMNS,
+            basename_template=f"part-{self.batches}-{{i}}.parquet"
+        )
+        self.batch = []
+        self.batches += 1
+
+    def close(self):
+        if STORAGE == "parquet":
+            self.flush()
+        else:
+            self.file.write("\n]" if self.count else "[]")
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def events_exist(name):
+    if STORAGE == "parquet":
+        return os.path.isdir(dataset_dir(name))
+    return os.path.exists(f"{name}.json")
+
+
+def save_events(name, events):
+    """Write one layer's Events, replacing any previous output of that layer."""
+    with EventWriter(name) as writer:
+        for e in events:
+            writer.write(e)
+    return writer.count
+
+
+def load_events(name, columns=None, filter=None):
+    """Read one layer's events as Event objects.
+
+    columns limits the fields returned and filter is a pyarrow.dataset
+    expression (e.g. ds.field("event_type") == "review"); with Parquet storage
+    both are pushed down into the scan, with JSON they are applied after loading.
+    """
+    if STORAGE != "parquet":
+        with open(f"{name}.json", "r", encoding="utf-8") as f:
+            events = json.load(f)
+        if filter is not None:
+            raise ValueError("filter expressions need IMPACT_STORAGE=parquet")
+        if columns is not None:
+            events = [{c: e[c] for c in columns if c in e} for e in events]
+        return [Event.from_dict(e) for e in events]
+
+    import pyarrow.dataset as ds
+
+    path = dataset_dir(name)
+    if not os.path.exists(path):
+        return []
+
+    import pyarrow as pa
+
+    # Batches are typed independently (a batch may hold only nulls for a field), so
+    # read with the widest type each column was written with
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    schema = pa.unify_schemas([f.physical_schema for f in dataset.get_fragments()], promote_options="permissive")
+    for field in dataset.partitioning.schema:
+        schema = schema.append(field)
+    dataset = ds.dataset(path, format="parquet", partitioning="hive", schema=schema)
+
+    scan_columns = None if columns is None else list(columns) + [ORDER_COLUMN]
+    table = dataset.to_table(columns=scan_columns, filter=filter).sort_by(ORDER_COLUMN)
+
+    hidden = [ORDER_COLUMN] + PARTITION_COLUMNS
+    table = table.drop_columns([c for c in hidden if c in table.column_names and c not in (columns or [])])
+
+    events = table.to_pylist()
+    for e in events:
+        for col in JSON_COLUMNS:
+            if col in e and e[col] is not None:
+                e[col] = json.loads(e[col])
+    return [Event.from_dict(e) for e in events]
+
+
+def save_records(name, records, key="actor"):
+    """Write a {key: {...}} layer output (roles, explanations)."""
+    if STORAGE != "parquet":
+        with open(f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = [{key: k, **v, ORDER_COLUMN: i, "repo": REPO} for i, (k, v) in enumerate(records.items())]
+
+    path = dataset_dir(name)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    if rows:
+        pq.write_to_dataset(pa.Table.from_pylist(rows), path, partition_cols=["repo"])
+
+
+def load_records(name, key="actor"):
+    if STORAGE != "parquet":
+        with open(f"{name}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    import pyarrow.dataset as ds
+
+    path = dataset_dir(name)
+    if not os.path.exists(path):
+        return {}
+
+    table = ds.dataset(path, format="parquet", partitioning="hive").to_table().sort_by(ORDER_COLUMN)
+    records = {}
+    for row in table.drop_columns([ORDER_COLUMN, "repo"]).to_pylist():
+        records[row.pop(key)] = row
+    return records
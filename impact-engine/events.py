@@ -0,0 +1,144 @@
+import sys
+import uuid
+from dataclasses import dataclass, field
+
+# ---------------- EVENT MODEL ----------------
+# One slotted object per event instead of nested dicts. Ids are stored as a
+# uuid's 128-bit integer and repeated strings (actors, event types, intents...)
+# are interned, so a million events share one copy of each. to_dict() and
+# from_dict() convert to and from the JSON shape the layer files have always had.
+
+
+def intern(s):
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+# Ids are name-based uuids of the event's source identity (repo, kind, commit
+# SHA / PR number / review id / transcript offset), so the same commit or review
+# gets the same id on every run
+ID_NAMESPACE = uuid.UUID("5d0c6f0e-3b7a-4c59-9d0e-2f3c1a7b8e41")
+
+
+def stable_event_id(repo, kind, *source):
+    return uuid.uuid5(ID_NAMESPACE, "|".join([repo, kind, *map(str, source)])).int
+
+
+@dataclass(slots=True)
+class Related:
+    commit: object = None
+    pr: int = None
+    issue: int = None
+
+    def to_dict(self):
+        return {"commit": self.commit, "pr": self.pr, "issue": self.issue}
+
+
+@dataclass(slots=True)
+class Semantic:
+    intent: str
+    signals: list
+    quality: str
+    confidence: float
+
+    def __post_init__(self):
+        self.intent = intern(self.intent)
+        self.signals = [intern(s) for s in self.signals]
+        self.quality = intern(self.quality)
+
+    def to_dict(self):
+        return {
+            "intent": self.intent,
+            "signals": list(self.signals),
+            "quality": self.quality,
+            "confidence": self.confidence
+        }
+
+
+@dataclass(slots=True)
+class Structural:
+    merged: bool
+    size_score: int
+    discussion: int
+    timestamp: str
+
+    def to_dict(self):
+        return {
+            "merged": self.merged,
+            "size_score": self.size_score,
+            "discussion": self.discussion,
+            "timestamp": self.timestamp
+        }
+
+
+@dataclass(slots=True)
+class Metrics:
+    importance: int
+    complexity: int
+    unblocking: int
+    invisible: int
+    future: int
+    final_impact: int
+
+    def to_dict(self):
+        return {
+            "importance": self.importance,
+            "complexity": self.complexity,
+            "unblocking": self.unblocking,
+            "invisible": self.invisible,
+            "future": self.future,
+            "final_impact": self.final_impact
+        }
+
+
+@dataclass(slots=True)
+class Event:
+    event_id: int
+    actor: str
+    event_type: str
+    text: str
+    timestamp: str
+    related: Related = field(default_factory=Related)
+    metadata: dict = field(default_factory=dict)
+    # Filled in by layers 2-4
+    semantic: Semantic = None
+    structural: Structural = None
+    metrics: Metrics = None
+
+    def __post_init__(self):
+        self.actor = intern(self.actor)
+        self.event_type = intern(self.event_type)
+
+    def to_dict(self):
+        d = {
+            "event_id": str(uuid.UUID(int=self.event_id)),
+            "actor": self.actor,
+            "event_type": self.event_type,
+            "text": self.text,
+            "timestamp": self.timestamp,
+            "related": self.related.to_dict(),
+            "metadata": self.metadata
+        }
+        if self.semantic is not None:
+            d["semantic"] = self.semantic.to_dict()
+        if self.structural is not None:
+            d["structural"] = self.structural.to_dict()
+        if self.metrics is not None:
+            d["metrics"] = self.metrics.to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        """Inverse of to_dict(). Missing fields (e.g. a column-projected read) get empty defaults."""
+        event_id = d.get("event_id")
+        return cls(
+            event_id=uuid.UUID(event_id).int if event_id else 0,
+            actor=d.get("actor"),
+            event_type=d.get("event_type"),
+            text=d.get("text"),
+            timestamp=d.get("timestamp"),
+            related=Related(**d["related"]) if d.get("related") else Related(),
+            metadata=d.get("metadata") or {},
+            semantic=Semantic(**d["semantic"]) if d.get("semantic") else None,
+            structural=Structural(**d["structural"]) if d.get("structural") else None,
+            metrics=Metrics(**d["metrics"]) if d.get("metrics") else None
+        )
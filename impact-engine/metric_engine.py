@@ -1,89 +1,106 @@
+import os
 import json
-
-# ---------- LOAD STRUCTURAL EVENTS ----------
-with open("structural_events.json", "r", encoding="utf-8") as f:
-    events = json.load(f)
-
-# ---------- SCORING FUNCTIONS ----------
-
-def work_importance(e):
-    intent = e["semantic"]["intent"]
-
-    if intent == "bugfix":
-        return 5
-    if intent == "feature":
-        return 4
-    if intent == "refactor":
-        return 3
-    if intent == "docs":
-        return 2
-    return 1  # other / noise
-
-
-def complexity_score(e):
-    size = e["structural"]["size_score"]
-    discussion = e["structural"]["discussion"]
-
-    score = 0
-    if size > 500:
-        score += 3
-    elif size > 100:
-        score += 2
-    elif size > 20:
-        score += 1
-
-    if discussion >= 5:
-        score += 2
-    elif discussion >= 2:
-        score += 1
-
-    return score
-
-
-def unblocking_score(e):
-    # proxy: merged PRs with discussion unblock others
-    if e["event_type"] == "pr" and e["structural"]["merged"]:
-        return 2 + min(e["structural"]["discussion"], 3)
-    return 0
-
-
-def invisible_work_score(e):
-    if e["event_type"] == "review":
-        if e["semantic"]["quality"] == "high":
-            return 3
-        return 1
-    return 0
-
-
-def future_impact_score(e):
-    intent = e["semantic"]["intent"]
-    if intent in ["refactor", "bugfix"]:
-        return 2
-    return 0
-
-
-# ---------- APPLY METRICS ----------
-for e in events:
-    metrics = {}
-
-    metrics["importance"] = work_importance(e)
-    metrics["complexity"] = complexity_score(e)
-    metrics["unblocking"] = unblocking_score(e)
-    metrics["invisible"] = invisible_work_score(e)
-    metrics["future"] = future_impact_score(e)
-
-    metrics["final_impact"] = (
-        metrics["importance"]
-        + metrics["complexity"]
-        + metrics["unblocking"]
-        + metrics["invisible"]
-        + metrics["future"]
+import numpy as np
+from events import Metrics
+from event_store import load_events, save_events
+
+# ---------- SCORING RULES ----------
+# Scores and thresholds live in metric_weights.json (IMPACT_METRIC_WEIGHTS to
+# point elsewhere); threshold lists are checked in order, first match wins.
+WEIGHTS_FILE = os.environ.get(
+    "IMPACT_METRIC_WEIGHTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metric_weights.json")
+)
+
+with open(WEIGHTS_FILE, "r", encoding="utf-8") as f:
+    WEIGHTS = json.load(f)
+
+# Events scored per vectorised batch
+BATCH_SIZE = 10000
+
+
+# ---------- VECTORISED SCORING ----------
+
+def lookup(values, table, default):
+    if not table:
+        return np.full(len(values), default)
+    return np.select([values == k for k in table], list(table.values()), default)
+
+
+def first_threshold(values, rules, compare):
+    if not rules:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.select([compare(values, t) for t, _ in rules], [s for _, s in rules], 0)
+
+
+def score_columns(intent, quality, event_type, size, discussion, merged):
+    """All metrics from whole columns (NumPy arrays, one row per event), as {metric: int array}."""
+    rule = WEIGHTS["complexity"]
+    unblock = WEIGHTS["unblocking"]
+    invisible = WEIGHTS["invisible"]
+
+    columns = {
+        "importance": lookup(intent, WEIGHTS["importance"]["by_intent"], WEIGHTS["importance"]["default"]),
+        "complexity": (
+            first_threshold(size, rule["size_above"], np.greater)
+            + first_threshold(discussion, rule["discussion_at_least"], np.greater_equal)
+        ),
+        "unblocking": np.where(
+            (event_type == unblock["event_type"]) & merged,
+            unblock["base"] + np.minimum(discussion, unblock["discussion_cap"]),
+            0
+        ),
+        "invisible": np.where(
+            event_type == invisible["event_type"],
+            lookup(quality, invisible["by_quality"], invisible["default"]),
+            0
+        ),
+        "future": lookup(intent, WEIGHTS["future"]["by_intent"], WEIGHTS["future"]["default"]),
+    }
+    columns["final_impact"] = sum(columns.values())
+    return columns
+
+
+def score_batch(events):
+    return score_columns(
+        intent=np.array([e.semantic.intent for e in events]),
+        quality=np.array([e.semantic.quality for e in events]),
+        event_type=np.array([e.event_type for e in events]),
+        size=np.array([e.structural.size_score for e in events], dtype=np.int64),
+        discussion=np.array([e.structural.discussion for e in events], dtype=np.int64),
+        merged=np.array([bool(e.structural.merged) for e in events])
     )
 
-    e["metrics"] = metrics
 
-# ---------- SAVE ----------
-with open("metric_events.json", "w", encoding="utf-8") as f:
-    json.dump(events, f, indent=2)
-
-print("✅ Layer 4 complete: metric_events.json created")
+# ---------- APPLY METRICS ----------
+def add_metrics_batch(events):
+    if not events:
+        return events
+
+    columns = score_batch(events)
+    # Positional, in Metrics field order
+    rows = zip(*(columns[name].tolist() for name in
+                 ("importance", "complexity", "unblocking", "invisible", "future", "final_impact")))
+    for e, row in zip(events, rows):
+        e.metrics = Metrics(*row)
+    return events
+
+
+def metric_stage(events):
+    # Score in vectorised batches; memory stays at one batch of events
+    batch = []
+    for e in events:
+        batch.append(e)
+        if len(batch) >= BATCH_SIZE:
+            yield from add_metrics_batch(batch)
+            batch = []
+    yield from add_metrics_batch(batch)
+
+
+if __name__ == "__main__":
+    # ---------- LOAD STRUCTURAL EVENTS ----------
+    events = load_events("structural_events")
+
+    # ---------- SAVE ----------
+    save_events("metric_events", metric_stage(events))
+
+    print("✅ Layer 4 complete: metric_events created")
@@ -1,5 +1,8 @@
 import json
-import uuid
+import hashlib
+from events import Event, Related, stable_event_id
+from event_store import REPO, save_events
+from dedup import dedup_stage
 
 # ---------------- SAFE LOAD ----------------
 
@@ -24,165 +27,193 @@ def safe_get(d, keys, default=None):
 
 # ---------------- LOAD FILES ----------------
 
-commits_raw = load_json_safe("commits.json")
-issues_raw = load_json_safe("issues.json")
-prs_raw = load_json_safe("prs.json")
-reviews_raw = load_json_safe("reviews.json")
-transcript_raw = load_json_safe("transcript.json")
-
-normalized_events = []
-
-
-# ==================================================
-# COMMITS  (history → nodes)  ✅ FIXED
-# ==================================================
-
-commit_nodes = safe_get(
-    commits_raw,
-    ["data", "repository", "defaultBranchRef", "target", "history", "nodes"],
-    []
-)
-
-for node in commit_nodes:
-    author = safe_get(node, ["author", "user", "login"], "unknown")
-
-    normalized_events.append({
-        "event_id": str(uuid.uuid4()),
-        "actor": author,
-        "event_type": "commit",
-        "text": node.get("messageHeadline", ""),
-        "timestamp": node.get("committedDate", ""),
-        "related": {
-            "commit": None,
-            "pr": None,
-            "issue": None
-        },
-        "metadata": {
-            "additions": node.get("additions", 0),
-            "deletions": node.get("deletions", 0),
-            "files_changed": node.get("changedFiles", 0)
-        }
-    })
-
-
-# ==================================================
-# ISSUES
-# ==================================================
-
-issue_nodes = safe_get(
-    issues_raw,
-    ["data", "repository", "issues", "nodes"],
-    []
-)
-
-for issue in issue_nodes:
-    normalized_events.append({
-        "event_id": str(uuid.uuid4()),
-        "actor": safe_get(issue, ["author", "login"], "unknown"),
-        "event_type": "issue",
-        "text": issue.get("title", ""),
-        "timestamp": issue.get("createdAt", ""),
-        "related": {
-            "commit": None,
-            "pr": None,
-            "issue": issue.get("number")
-        },
-        "metadata": {
-            "labels": [l["name"] for l in safe_get(issue, ["labels", "nodes"], [])],
-            "state": "closed" if issue.get("closedAt") else "open",
-            "comments": safe_get(issue, ["comments", "totalCount"], 0)
-        }
-    })
-
-
-# ==================================================
-# PULL REQUESTS
-# ==================================================
-
-pr_nodes = safe_get(
-    prs_raw,
-    ["data", "repository", "pullRequests", "nodes"],
-    []
-)
-
-for pr in pr_nodes:
-    normalized_events.append({
-        "event_id": str(uuid.uuid4()),
-        "actor": safe_get(pr, ["author", "login"], "unknown"),
-        "event_type": "pr",
-        "text": pr.get("title", ""),
-        "timestamp": pr.get("createdAt", ""),
-        "related": {
-            "commit": None,
-            "pr": pr.get("number"),
-            "issue": None
-        },
-        "metadata": {
-            "merged": True if pr.get("mergedAt") else False,
-            "state": pr.get("state")
-        }
-    })
-
-
-# ==================================================
-# REVIEWS
-# ==================================================
-
-review_pr_nodes = safe_get(
-    reviews_raw,
-    ["data", "repository", "pullRequests", "nodes"],
-    []
-)
-
-for pr in review_pr_nodes:
-    pr_number = pr.get("number")
-    review_nodes = safe_get(pr, ["reviews", "nodes"], [])
-
-    for r in review_nodes:
-        normalized_events.append({
-            "event_id": str(uuid.uuid4()),
-            "actor": safe_get(r, ["author", "login"], "unknown"),
-            "event_type": "review",
-            "text": r.get("body", ""),
-            "timestamp": r.get("submittedAt", ""),
-            "related": {
-                "commit": None,
-                "pr": pr_number,
-                "issue": None
-            },
-            "metadata": {
-                "review_state": r.get("state")
+def load_sources():
+    return {
+        "commits": load_json_safe("commits.json"),
+        "issues": load_json_safe("issues.json"),
+        "prs": load_json_safe("prs.json"),
+        "reviews": load_json_safe("reviews.json"),
+        "transcript": load_json_safe("transcript.json")
+    }
+
+
+def iter_events(sources):
+    """Yield normalized events one at a time: commits, issues, PRs, reviews, transcript."""
+    commits_raw = sources["commits"]
+    issues_raw = sources["issues"]
+    prs_raw = sources["prs"]
+    reviews_raw = sources["reviews"]
+    transcript_raw = sources["transcript"]
+
+    # ==================================================
+    # COMMITS  (history → nodes)  ✅ FIXED
+    # ==================================================
+
+    commit_nodes = safe_get(
+        commits_raw,
+        ["data", "repository", "defaultBranchRef", "target", "history", "nodes"],
+        []
+    )
+
+    for node in commit_nodes:
+        author = safe_get(node, ["author", "user", "login"], "unknown")
+
+        yield Event(
+            # Older exports have no oid; fall back to what identifies the commit in them
+            event_id=stable_event_id(
+                REPO, "commit",
+                node.get("oid") or f'{node.get("committedDate")}|{author}|{node.get("messageHeadline")}'
+            ),
+            actor=author,
+            event_type="commit",
+            text=node.get("messageHeadline", ""),
+            timestamp=node.get("committedDate", ""),
+            related=Related(
+                commit=node.get("oid"),
+                pr=None,
+                issue=None
+            ),
+            metadata={
+                "additions": node.get("additions", 0),
+                "deletions": node.get("deletions", 0),
+                "files_changed": node.get("changedFiles", 0)
             }
-        })
-
-
-# ==================================================
-# TRANSCRIPT (SAFE IF EMPTY)
-# ==================================================
-
-if isinstance(transcript_raw, list):
-    for t in transcript_raw:
-        normalized_events.append({
-            "event_id": str(uuid.uuid4()),
-            "actor": t.get("speaker", "unknown"),
-            "event_type": "transcript",
-            "text": t.get("text", ""),
-            "timestamp": t.get("time", ""),
-            "related": {
-                "commit": None,
-                "pr": None,
-                "issue": None
-            },
-            "metadata": {}
-        })
+        )
+
+
+    # ==================================================
+    # ISSUES
+    # ==================================================
+
+    issue_nodes = safe_get(
+        issues_raw,
+        ["data", "repository", "issues", "nodes"],
+        []
+    )
+
+    for issue in issue_nodes:
+        yield Event(
+            event_id=stable_event_id(REPO, "issue", issue.get("number") or issue.get("createdAt")),
+            actor=safe_get(issue, ["author", "login"], "unknown"),
+            event_type="issue",
+            text=issue.get("title", ""),
+            timestamp=issue.get("createdAt", ""),
+            related=Related(
+                commit=None,
+                pr=None,
+                issue=issue.get("number")
+            ),
+            metadata={
+                "labels": [l["name"] for l in safe_get(issue, ["labels", "nodes"], [])],
+                "state": "closed" if issue.get("closedAt") else "open",
+                "comments": safe_get(issue, ["comments", "totalCount"], 0)
+            }
+        )
+
+
+    # ==================================================
+    # PULL REQUESTS
+    # ==================================================
+
+    pr_nodes = safe_get(
+        prs_raw,
+        ["data", "repository", "pullRequests", "nodes"],
+        []
+    )
+
+    for pr in pr_nodes:
+        yield Event(
+            event_id=stable_event_id(REPO, "pr", pr.get("number")),
+            actor=safe_get(pr, ["author", "login"], "unknown"),
+            event_type="pr",
+            text=pr.get("title", ""),
+            timestamp=pr.get("createdAt", ""),
+            related=Related(
+                commit=None,
+                pr=pr.get("number"),
+                issue=None
+            ),
+            metadata={
+                "merged": True if pr.get("mergedAt") else False,
+                "state": pr.get("state")
+            }
+        )
+
+
+    # ==================================================
+    # REVIEWS
+    # ==================================================
+
+    review_pr_nodes = safe_get(
+        reviews_raw,
+        ["data", "repository", "pullRequests", "nodes"],
+        []
+    )
+
+    # Older exports have no review id; fall back to the review's content, never
+    # its place in the file, which shifts as reviews come and go. Reviews with
+    # identical content are told apart by a count, which is stable because they
+    # are interchangeable.
+    seen_content = {}
+
+    for pr in review_pr_nodes:
+        pr_number = pr.get("number")
+        review_nodes = safe_get(pr, ["reviews", "nodes"], [])
+
+        for r in review_nodes:
+            author = safe_get(r, ["author", "login"], "unknown")
+
+            source = r.get("id")
+            if not source:
+                body_hash = hashlib.sha1(r.get("body", "").encode("utf-8")).hexdigest()
+                content = f'{pr_number}|{author}|{r.get("state")}|{r.get("submittedAt")}|{body_hash}'
+                seen_content[content] = seen_content.get(content, 0) + 1
+                source = f"{content}|{seen_content[content]}"
+
+            yield Event(
+                event_id=stable_event_id(REPO, "review", source),
+                actor=author,
+                event_type="review",
+                text=r.get("body", ""),
+                timestamp=r.get("submittedAt", ""),
+                related=Related(
+                    commit=None,
+                    pr=pr_number,
+                    issue=None
+                ),
+                metadata={
+                    "review_state": r.get("state")
+                }
+            )
+
+
+    # ==================================================
+    # TRANSCRIPT (SAFE IF EMPTY)
+    # ==================================================
+
+    if isinstance(transcript_raw, list):
+        for offset, t in enumerate(transcript_raw):
+            yield Event(
+                event_id=stable_event_id(REPO, "transcript", offset, t.get("time", "")),
+                actor=t.get("speaker", "unknown"),
+                event_type="transcript",
+                text=t.get("text", ""),
+                timestamp=t.get("time", ""),
+                related=Related(
+                    commit=None,
+                    pr=None,
+                    issue=None
+                ),
+                metadata={}
+            )
 
 
 # ==================================================
 # SAVE OUTPUT
 # ==================================================
 
-with open("normalized_events.json", "w", encoding="utf-8") as f:
-    json.dump(normalized_events, f, indent=2)
+if __name__ == "__main__":
+    count = save_events("normalized_events", dedup_stage(iter_events(load_sources())))
 
-print("✅ Layer 1 DONE")
-print(f"📊 Total normalized events: {len(normalized_events)}")
+    print("✅ Layer 1 DONE")
+    print(f"📊 Total normalized events: {count}")
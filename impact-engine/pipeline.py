@@ -0,0 +1,158 @@
+import sys
+import time
+from event_store import EventWriter, events_exist, load_events, save_records
+from normalize import load_sources, iter_events
+from dedup import dedup_stage, Upsert
+from semantic_layer import semantic_stage
+from structural_layer import structural_stage
+from metric_engine import metric_stage
+from actor_index import ActorIndex
+from role_engine import infer_roles
+from explainability import explain
+from dashboard_export import build_dashboard, save_dashboard
+
+# ---------------- IMPACT PIPELINE ----------------
+# Runs layers 1-7 in one process. Events flow through the per-event layers as
+# generators, one at a time, into the per-actor index of layers 5-7, so
+# memory stays flat in the number of events. Nothing is written unless asked for:
+#
+#   python pipeline.py --save=semantic_events,actor_roles,dashboard
+#
+# The dashboard's employee profiles embed every event, so requesting
+# "dashboard" keeps the metric events in memory.
+#
+# --incremental keeps the previous run's metric_events and only sends new or
+# changed source events through layers 2-4 (run without it after changing
+# keywords or metric weights). The previous events are held in memory and
+# metric_events is always saved, as the base for the next run.
+
+EVENT_OUTPUTS = ["normalized_events", "semantic_events", "structural_events", "metric_events"]
+RECORD_OUTPUTS = ["actor_roles", "explainability"]
+DEFAULT_OUTPUTS = ["actor_roles", "explainability", "dashboard"]
+
+
+INCREMENTAL = "--incremental" in sys.argv
+
+
+def parse_outputs(argv):
+    for arg in argv:
+        if arg.startswith("--save="):
+            outputs = [o for o in arg.split("=", 1)[1].split(",") if o]
+            unknown = set(outputs) - set(EVENT_OUTPUTS + RECORD_OUTPUTS + ["dashboard"])
+            if unknown:
+                raise SystemExit(f"❌ Unknown outputs: {', '.join(sorted(unknown))}")
+            return outputs
+    return DEFAULT_OUTPUTS
+
+
+def timed(name, events, timings):
+    """Pass events through, adding the time spent pulling them (this stage and everything upstream)."""
+    it = iter(events)
+    while True:
+        start = time.perf_counter()
+        try:
+            e = next(it)
+        except StopIteration:
+            timings[name] = timings.get(name, 0) + time.perf_counter() - start
+            return
+        timings[name] = timings.get(name, 0) + time.perf_counter() - start
+        yield e
+
+
+def tap(events, writer):
+    for e in events:
+        writer.write(e)
+        yield e
+
+
+def run(outputs=DEFAULT_OUTPUTS, incremental=False):
+    """Run every layer; returns {stage: seconds} with each stage's own time."""
+    if incremental:
+        partial = set(outputs) & set(EVENT_OUTPUTS[:-1])
+        if partial:
+            raise SystemExit(f"❌ {', '.join(sorted(partial))} only hold re-processed events in incremental runs")
+        outputs = list(outputs) + ["metric_events"]
+
+    order = []
+    inclusive = {}
+    writers = []
+
+    def stage(name, events):
+        order.append(name)
+        return timed(name, events, inclusive)
+
+    stream = stage("normalize", iter_events(load_sources()))
+    stream = stage("dedup", dedup_stage(stream))
+
+    upsert = None
+    if incremental:
+        # Read before the metric_events writer below replaces the file
+        upsert = Upsert(load_events("metric_events") if events_exist("metric_events") else [])
+        stream = stage("skip unchanged", upsert.changed(stream))
+
+    for name, layer in zip(EVENT_OUTPUTS, [None, semantic_stage, structural_stage, metric_stage]):
+        if layer is not None:
+            stream = stage(name.replace("_events", ""), layer(stream))
+        if upsert is not None and name == "metric_events":
+            stream = stage("upsert", upsert.merged(stream))
+        if name in outputs:
+            writer = EventWriter(name)
+            writers.append(writer)
+            stream = stage(f"save {name}", tap(stream, writer))
+
+    keep = "dashboard" in outputs
+    index = ActorIndex(keep_events=keep)
+
+    start = time.perf_counter()
+    for e in stream:
+        index.add(e)
+    loop = time.perf_counter() - start
+
+    # Each generator's time includes its upstream stages; report each stage's own share
+    timings = {}
+    upstream = 0
+    for name in order:
+        timings[name] = inclusive.get(name, 0) - upstream
+        upstream = inclusive.get(name, 0)
+    timings["actor index"] = loop - upstream
+
+    start = time.perf_counter()
+    for writer in writers:
+        writer.close()
+    if writers:
+        timings["flush outputs"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    roles = infer_roles(index)
+    timings["roles"] = time.perf_counter() - start
+    if "actor_roles" in outputs:
+        save_records("actor_roles", roles)
+
+    start = time.perf_counter()
+    explanations = explain(roles, index)
+    timings["explainability"] = time.perf_counter() - start
+    if "explainability" in outputs:
+        save_records("explainability", explanations)
+
+    if keep:
+        start = time.perf_counter()
+        save_dashboard(build_dashboard(index, explanations))
+        timings["dashboard"] = time.perf_counter() - start
+
+    if upsert is not None:
+        if upsert.full_run:
+            print("♻️ Previous metric_events predate stable event ids; ran every event")
+        print(f"♻️ {upsert.unchanged} unchanged, {upsert.updated} updated, {upsert.added} new events")
+
+    return timings
+
+
+if __name__ == "__main__":
+    outputs = parse_outputs(sys.argv[1:])
+    print(f"🚀 Impact pipeline (saving: {', '.join(outputs) or 'nothing'})")
+
+    timings = run(outputs, incremental=INCREMENTAL)
+
+    for name, seconds in timings.items():
+        print(f"⏱️ {name:<28} {seconds * 1000:8.1f} ms")
+    print(f"✅ Pipeline complete in {sum(timings.values()):.2f}s")
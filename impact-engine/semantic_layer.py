@@ -1,47 +1,109 @@
+import os
 import json
 import re
-from pathlib import Path
-
-# ---------- LOAD NORMALIZED EVENTS ----------
-with open("normalized_events.json", "r", encoding="utf-8") as f:
-    events = json.load(f)
+from events import Semantic
+from event_store import load_events, save_events
 
 # ---------- SIMPLE NLP HELPERS ----------
 
-BUG_KEYWORDS = ["bug", "fix", "error", "break", "fail", "regression"]
-FEATURE_KEYWORDS = ["add", "introduce", "support", "enable", "feature"]
-REFACTOR_KEYWORDS = ["refactor", "cleanup", "remove", "simplify", "drop"]
-DOC_KEYWORDS = ["doc", "readme", "documentation", "typo"]
-
-MENTOR_KEYWORDS = ["suggest", "consider", "recommend", "maybe", "could you"]
-ARCH_KEYWORDS = ["design", "architecture", "approach", "structure"]
-BLOCKING_KEYWORDS = ["block", "blocking", "depends", "unblock"]
-
-def classify_intent(text):
-    t = text.lower()
-    if any(k in t for k in BUG_KEYWORDS):
-        return "bug_fix"
-    if any(k in t for k in FEATURE_KEYWORDS):
-        return "feature"
-    if any(k in t for k in REFACTOR_KEYWORDS):
-        return "refactor"
-    if any(k in t for k in DOC_KEYWORDS):
-        return "docs"
+# Keyword dictionaries, in priority order for intents, plus example texts per
+# intent for the embedding backend. Point IMPACT_KEYWORDS at another file with
+# the same shape to swap them.
+KEYWORDS_FILE = os.environ.get(
+    "IMPACT_KEYWORDS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords.json")
+)
+
+
+def load_keywords(path=KEYWORDS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        keywords = json.load(f)
+    check_prefixes(keywords)
+    return keywords
+
+
+def check_prefixes(keywords):
+    """Reject keywords that start another group's keyword ("fix" / "fixture").
+
+    The matcher reports one group per match, so for such a pair only the group
+    listed first would ever be seen, whatever the text says.
+    """
+    words = [
+        (f"{kind}.{name}", " ".join(w.lower().split()))
+        for kind in ("intents", "signals")
+        for name, group in keywords[kind].items()
+        for w in group
+    ]
+    for group, word in words:
+        for other_group, other in words:
+            if group != other_group and other.startswith(word):
+                raise ValueError(
+                    f"Keyword '{word}' ({group}) is a prefix of '{other}' ({other_group}); "
+                    "keywords of different groups must not share a prefix"
+                )
+
+
+def build_matcher(keywords):
+    """One alternation with a named group per intent/signal, run on lower-cased text.
+
+    Keywords only match at the start of a word, so "fix" finds "fixes" and
+    "fixed" but not "prefix"; spaces in phrases match any whitespace.
+    """
+    groups = []
+    for kind in ("intents", "signals"):
+        for name, words in keywords[kind].items():
+            alternatives = "|".join(
+                r"\s+".join(re.escape(part) for part in w.lower().split())
+                for w in words
+            )
+            groups.append(f"(?P<{kind[:-1]}_{name}>{alternatives})")
+
+    # A lookbehind rather than \b: cheaper to test at every position
+    return re.compile(r"(?<!\w)(?:" + "|".join(groups) + ")")
+
+
+KEYWORDS = load_keywords()
+MATCHER = build_matcher(KEYWORDS)
+# (group name, label) pairs, intents in priority order
+INTENT_GROUPS = [(f"intent_{name}", name) for name in KEYWORDS["intents"]]
+SIGNAL_GROUPS = [(f"signal_{name}", name) for name in KEYWORDS["signals"]]
+
+
+def match_keywords(text):
+    """Every intent/signal group with a keyword in text, from a single scan."""
+    return {m.lastgroup for m in MATCHER.finditer(text.lower())}
+
+
+def classify_intent(text, hits=None):
+    hits = match_keywords(text) if hits is None else hits
+    for group, intent in INTENT_GROUPS:
+        if group in hits:
+            return intent
     return "other"
 
-def extract_signals(text):
-    t = text.lower()
-    signals = []
-    if any(k in t for k in MENTOR_KEYWORDS):
-        signals.append("mentoring")
-    if any(k in t for k in ARCH_KEYWORDS):
-        signals.append("architecture")
-    if any(k in t for k in BLOCKING_KEYWORDS):
-        signals.append("blocking")
+def extract_signals(text, hits=None):
+    hits = match_keywords(text) if hits is None else hits
+    signals = [signal for group, signal in SIGNAL_GROUPS if group in hits]
     if len(text.strip()) < 10:
         signals.append("noise")
     return signals
 
+# ---------- INTENT BACKEND ----------
+# "keywords" matches the lists above; "embedding" classifies intents with a
+# local embedding model in batches (see embedding_backend.py). Signals and
+# quality always come from the heuristics here.
+SEMANTIC_BACKEND = os.environ.get("IMPACT_SEMANTIC_BACKEND", "keywords")
+
+_classifier = None
+
+
+def intent_classifier():
+    global _classifier
+    if _classifier is None:
+        from embedding_backend import EmbeddingClassifier
+        _classifier = EmbeddingClassifier(KEYWORDS.get("examples") or KEYWORDS["intents"])
+    return _classifier
+
+
 def quality_score(text):
     length = len(text.split())
     if length > 15:
@@ -51,26 +113,58 @@ def quality_score(text):
     return "low", 0.3
 
 # ---------- MAIN SEMANTIC PASS ----------
-semantic_events = []
-
-for e in events:
-    text = e.get("text", "") or ""
+def add_semantic(e, intent=None):
+    """Attach semantic signals; intent may come precomputed from a batch backend."""
+    text = e.text or ""
 
-    intent = classify_intent(text)
-    signals = extract_signals(text)
+    hits = match_keywords(text)
+    if intent is None:
+        intent = classify_intent(text, hits)
+    signals = extract_signals(text, hits)
     quality, confidence = quality_score(text)
 
-    e["semantic"] = {
-        "intent": intent,
-        "signals": signals,
-        "quality": quality,
-        "confidence": confidence
-    }
+    e.semantic = Semantic(
+        intent=intent,
+        signals=signals,
+        quality=quality,
+        confidence=confidence
+    )
+    return e
+
+
+def semantic_stage(events):
+    if SEMANTIC_BACKEND == "keywords":
+        for e in events:
+            yield add_semantic(e)
+        return
+
+    if SEMANTIC_BACKEND != "embedding":
+        raise ValueError(f"Unknown semantic backend: {SEMANTIC_BACKEND}")
+
+    # Classify in batches; memory stays at one batch of events
+    classifier = intent_classifier()
+    batch = []
+    for e in events:
+        batch.append(e)
+        if len(batch) >= classifier.batch_size:
+            yield from classify_batch(classifier, batch)
+            batch = []
+    yield from classify_batch(classifier, batch)
+
+
+def classify_batch(classifier, batch):
+    if not batch:
+        return
+    intents = classifier.classify([e.text or "" for e in batch])
+    for e, intent in zip(batch, intents):
+        yield add_semantic(e, intent)
+
 
-    semantic_events.append(e)
+if __name__ == "__main__":
+    # ---------- LOAD NORMALIZED EVENTS ----------
+    events = load_events("normalized_events")
 
-# ---------- SAVE OUTPUT ----------
-with open("semantic_events.json", "w", encoding="utf-8") as f:
-    json.dump(semantic_events, f, indent=2)
+    # ---------- SAVE OUTPUT ----------
+    save_events("semantic_events", semantic_stage(events))
 
-print("✅ Layer 2 complete: semantic_events.json created")
+    print("✅ Layer 2 complete: semantic_events created")
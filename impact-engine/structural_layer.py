@@ -1,9 +1,5 @@
-import json
-from datetime import datetime
-
-# ---------- LOAD SEMANTIC EVENTS ----------
-with open("semantic_events.json", "r", encoding="utf-8") as f:
-    events = json.load(f)
+from events import Structural
+from event_store import load_events, save_events
 
 def normalize_time(ts):
     if not ts:
@@ -14,34 +10,43 @@ def normalize_time(ts):
         return None
 
 # ---------- STRUCTURAL SIGNAL EXTRACTION ----------
-for e in events:
-    structural = {}
-
+def add_structural(e):
     # Merge signal (PR only)
-    structural["merged"] = (
-        e["event_type"] == "pr"
-        and e["metadata"].get("merged", False)
+    merged = (
+        e.event_type == "pr"
+        and e.metadata.get("merged", False)
     )
 
     # Size signal (commit impact proxy)
-    if e["event_type"] == "commit":
-        structural["size_score"] = (
-            e["metadata"].get("additions", 0)
-            + e["metadata"].get("deletions", 0)
+    if e.event_type == "commit":
+        size_score = (
+            e.metadata.get("additions", 0)
+            + e.metadata.get("deletions", 0)
         )
     else:
-        structural["size_score"] = 0
+        size_score = 0
+
+    e.structural = Structural(
+        merged=merged,
+        size_score=size_score,
+        # Discussion signal
+        discussion=e.metadata.get("comments", 0),
+        # Timestamp (JSON-safe)
+        timestamp=normalize_time(e.timestamp)
+    )
+    return e
+
 
-    # Discussion signal
-    structural["discussion"] = e["metadata"].get("comments", 0)
+def structural_stage(events):
+    for e in events:
+        yield add_structural(e)
 
-    # Timestamp (JSON-safe)
-    structural["timestamp"] = normalize_time(e.get("timestamp"))
 
-    e["structural"] = structural
+if __name__ == "__main__":
+    # ---------- LOAD SEMANTIC EVENTS ----------
+    events = load_events("semantic_events")
 
-# ---------- SAVE ----------
-with open("structural_events.json", "w", encoding="utf-8") as f:
-    json.dump(events, f, indent=2)
+    # ---------- SAVE ----------
+    save_events("structural_events", structural_stage(events))
 
-print("✅ Layer 3 complete: structural_events.json created")
+    print("✅ Layer 3 complete: structural_events created")
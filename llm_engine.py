@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import ollama
+
+MODEL = "phi3"
+CACHE_DIR = ".llm_cache"
+DEFAULT_OPTIONS = {"temperature": 0}
+
+# Requests sent to Ollama at once. The server only runs them in parallel up to
+# its own OLLAMA_NUM_PARALLEL; point OLLAMA_HOST at a stub server for offline runs.
+MAX_IN_FLIGHT = int(os.environ.get("OLLAMA_MAX_IN_FLIGHT", "4"))
+
+
+def cache_key(model, prompt, options, schema=None):
+    payload = json.dumps({"model": model, "prompt": prompt, "options": options, "format": schema}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + ".json")
+
+
+def read_cache(key):
+    path = cache_path(key)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["content"]
+
+
+def write_cache(key, model, content):
+    path = cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"model": model, "content": content}, f)
+    os.replace(tmp, path)
+
+
+def evict_cache(key):
+    try:
+        os.remove(cache_path(key))
+    except FileNotFoundError:
+        pass
+
+
+def chat(prompt, model=MODEL, options=None, schema=None):
+    """Single-prompt chat, served from the on-disk cache when the same (model, prompt, options, schema) ran before.
+
+    With a JSON schema, Ollama constrains decoding to output matching it.
+    """
+    options = options or DEFAULT_OPTIONS
+    key = cache_key(model, prompt, options, schema)
+
+    content = read_cache(key)
+    if content is None:
+        response = ollama.chat(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            options=options,
+            format=schema
+        )
+        content = response["message"]["content"]
+        write_cache(key, model, content)
+
+    return content
+
+
+def validate(value, schema, path="$"):
+    """Check value against the subset of JSON schema used by our prompts. Raises ValueError."""
+    kind = schema.get("type")
+
+    if kind == "object":
+        if not isinstance(value, dict):
+            raise ValueError(f"{path}: expected an object")
+        for key in schema.get("required", []):
+            if key not in value:
+                raise ValueError(f"{path}: missing '{key}'")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                validate(value[key], sub, f"{path}.{key}")
+    elif kind == "array":
+        if not isinstance(value, list):
+            raise ValueError(f"{path}: expected an array")
+        for i, item in enumerate(value):
+            validate(item, schema.get("items", {}), f"{path}[{i}]")
+    elif kind == "string" and not isinstance(value, str):
+        raise ValueError(f"{path}: expected a string")
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise ValueError(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    return value
+
+
+def chat_json(prompt, schema, model=MODEL, options=None):
+    """Schema-constrained chat, parsed and validated. Raises ValueError if the model output does not match."""
+    content = chat(prompt, model, options, schema)
+    try:
+        return validate(json.loads(content), schema)
+    except ValueError as e:
+        # Don't keep a bad reply, or every rerun would fail on the same cached content
+        evict_cache(cache_key(model, prompt, options or DEFAULT_OPTIONS, schema))
+        raise ValueError(f"{model} returned output that does not match the schema ({e}): {content[:200]}") from e
+
+
+def run_many(fn, items, max_in_flight=MAX_IN_FLIGHT):
+    """Apply fn to items with at most max_in_flight calls outstanding. Results keep input order."""
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        return list(pool.map(fn, items))
+
+
+def chat_json_many(prompts, schema, model=MODEL, options=None, max_in_flight=MAX_IN_FLIGHT):
+    """chat_json() over many prompts concurrently."""
+    return run_many(lambda p: chat_json(p, schema, model, options), prompts, max_in_flight)
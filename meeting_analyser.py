@@ -1,51 +1,57 @@
-import re
 import json
-import ollama
-from collections import defaultdict
 from datetime import datetime
+from transcript_reader import read_transcript, aggregate_speakers, chunk_transcript
+from llm_engine import chat_json, chat_json_many, run_many
 
 TRANSCRIPT_FILE = "meeting_transcript.txt"
 OUTPUT_FILE = "meeting_intelligence.json"
 MODEL = "phi3"
 
-# --------------------------
-# 1. LOAD TRANSCRIPT
-# --------------------------
-with open(TRANSCRIPT_FILE, "r", encoding="utf-8") as f:
-    transcript = f.readlines()
-
-# Format: [12:34] username: sentence
-pattern = re.compile(r"\[(\d+:\d+)\]\s*(.*?):\s*(.*)")
+# Overall summary is map-reduced over transcript chunks of this size
+CHUNK_SECONDS = 600
+CHUNK_WORDS = 1500
+REDUCE_FANIN = 8
+
+BEHAVIOR_TYPES = ["Silent Architect", "Firefighter", "Mentor", "Builder", "Noisy Contributor", "Coordinator", "Observer"]
+
+# Passed to Ollama as `format`, so decoding is constrained to these shapes
+MEMBER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "important_topics": {"type": "array", "items": {"type": "string"}},
+        "behavior_type": {"type": "string", "enum": BEHAVIOR_TYPES}
+    },
+    "required": ["summary", "important_topics", "behavior_type"]
+}
 
-records = []
-for line in transcript:
-    match = pattern.search(line)
-    if match:
-        time, speaker, text = match.groups()
-        records.append((time, speaker.strip(), text.strip()))
+MEETING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "topics": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["summary", "topics"]
+}
 
 # --------------------------
-# 2. GROUP BY SPEAKER
+# 1. STREAM TRANSCRIPT + 2. GROUP BY SPEAKER
 # --------------------------
-speaker_data = defaultdict(list)
-for _, speaker, text in records:
-    speaker_data[speaker].append(text)
+speakers, total_lines = aggregate_speakers(read_transcript(TRANSCRIPT_FILE))
 
 # --------------------------
 # 3. PYTHON METRICS
 # --------------------------
 member_stats = {}
-total_lines = len(records)
 
-for speaker, texts in speaker_data.items():
-    word_count = sum(len(t.split()) for t in texts)
-    est_time = word_count * 0.5
+for speaker, stats in speakers.items():
+    est_time = stats.words * 0.5
 
     member_stats[speaker] = {
-        "lines_spoken": len(texts),
-        "words": word_count,
+        "lines_spoken": stats.lines_spoken,
+        "words": stats.words,
         "time_spoken_seconds": int(est_time),
-        "full_text": " ".join(texts)
+        "full_text": stats.full_text
     }
 
 sorted_members = sorted(member_stats.items(), key=lambda x: x[1]["time_spoken_seconds"])
@@ -58,9 +64,8 @@ most_speakers = [m[0] for m in sorted_members[-3:]]
 final_members = []
 print("🧠 Summarising members using local AI...")
 
-for name, info in member_stats.items():
-
-    prompt = f"""
+def member_prompt(info):
+    return f"""
 You are an enterprise meeting analyst.
 
 From this person's speech, return ONLY JSON:
@@ -75,22 +80,16 @@ Speech:
 {info['full_text']}
 """
 
-    response = ollama.chat(
-        model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        options={"temperature": 0}
-    )
+# Speakers are summarised concurrently with schema-constrained output;
+# unchanged speech is served from the cache
+ai_outputs = chat_json_many(
+    [member_prompt(info) for info in member_stats.values()],
+    MEMBER_SCHEMA,
+    model=MODEL,
+    options={"temperature": 0}
+)
 
-    raw = response["message"]["content"]
-
-    try:
-        ai_json = json.loads(re.search(r"\{.*\}", raw, re.S).group())
-    except:
-        ai_json = {
-            "summary": raw[:200],
-            "important_topics": [],
-            "behavior_type": "Observer"
-        }
+for (name, info), ai_json in zip(member_stats.items(), ai_outputs):
 
     relevance = min(100, int((info["words"] / total_lines) * 120))
 
@@ -105,11 +104,12 @@ Speech:
     })
 
 # --------------------------
-# 5. ROBUST OVERALL SUMMARY
+# 5. ROBUST OVERALL SUMMARY (MAP-REDUCE)
 # --------------------------
 print("🧠 Generating overall meeting summary...")
 
-meeting_prompt = f"""
+def meeting_prompt(transcript_text):
+    return f"""
 You are an enterprise meeting intelligence engine.
 
 CRITICAL:
@@ -129,45 +129,52 @@ Rules:
 - topics must be short technical/business phrases
 
 Transcript:
-{''.join(transcript)}
+{transcript_text}
 """
 
-def extract_json_block(text):
-    try:
-        match = re.search(r"\{.*\}", text, re.S)
-        if match:
-            return json.loads(match.group())
-    except:
-        return None
-
-meeting_json = None
-raw_output = ""
-
-for attempt in range(2):
-    meeting_response = ollama.chat(
-        model=MODEL,
-        messages=[{"role": "user", "content": meeting_prompt if attempt == 0 else f"""
-Your previous output was invalid JSON.
-
-Fix it and return ONLY correct JSON.
-
-Broken output:
-{raw_output}
-"""}],
-        options={"temperature": 0}
-    )
-
-    raw_output = meeting_response["message"]["content"]
-    meeting_json = extract_json_block(raw_output)
-
-    if meeting_json:
-        break
-
-if not meeting_json:
-    meeting_json = {
-        "summary": "Meeting focused on platform stability, authentication risks, Kubernetes restarts, API reliability, and security improvements.",
-        "topics": ["authentication", "kubernetes stability", "security", "API management", "performance"]
-    }
+def reduce_prompt(partials):
+    parts = "\n".join(json.dumps(p) for p in partials)
+    return f"""
+You are an enterprise meeting intelligence engine.
+
+Below are JSON summaries of consecutive parts of ONE meeting, in order.
+Merge them into one summary of the whole meeting.
+
+CRITICAL:
+- Output ONLY valid JSON
+- No markdown
+- No explanations
+- Start with {{ and end with }}
+
+Schema:
+{{
+ "summary": string,
+ "topics": [string]
+}}
+
+Rules:
+- summary under 120 words
+- topics must be short technical/business phrases, no duplicates
+
+Partial summaries:
+{parts}
+"""
+
+def summarise_json(prompt):
+    return chat_json(prompt, MEETING_SCHEMA, model=MODEL, options={"temperature": 0})
+
+# MAP: summarise time/word-bounded chunks in parallel. Each chunk is cached on its
+# own, so re-running on an extended transcript only summarises the new tail.
+chunks = list(chunk_transcript(read_transcript(TRANSCRIPT_FILE), CHUNK_SECONDS, CHUNK_WORDS))
+partials = run_many(summarise_json, [meeting_prompt(c) for c in chunks])
+print(f"   {len(chunks)} transcript chunks summarised")
+
+# REDUCE: merge partial summaries REDUCE_FANIN at a time until one is left
+while len(partials) > 1:
+    groups = [partials[i:i + REDUCE_FANIN] for i in range(0, len(partials), REDUCE_FANIN)]
+    partials = run_many(summarise_json, [reduce_prompt(g) for g in groups])
+
+meeting_json = partials[0] if partials else {"summary": "", "topics": []}
 
 # --------------------------
 # 6. FINAL PRODUCT FILE
@@ -189,30 +196,30 @@ print("✅ FINAL PRODUCT FILE CREATED:", OUTPUT_FILE)
 # --------------------------
 # 7. SAVE TO DATABASE (VERSIONED)
 # --------------------------
-from db_engine import get_db, get_next_version
+from db_engine import transaction, insert_rows, begin_run, close_db
 
 print("🗄️ Saving meeting intelligence to database...")
 
-db = get_db()
-version = get_next_version("meeting_intelligence")
-
-for member in final_members:
-    db.execute("""
-        INSERT INTO meeting_intelligence VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        version,
-        member["name"],
-        member["involvement_score"],
-        member["time_spoken_seconds"],
-        member["lines_spoken"],
-        member["behavior_type"],
-        json.dumps(member["important_topics"]),
-        member["summary"],
-        final_output["overall_meeting_summary"],
-        json.dumps(final_output["meeting_topics"]),
-        final_output["generated_at"]
-    ))
-
-db.close()
+with transaction() as db:
+    version = begin_run(db, "meeting_analyser")
+
+    insert_rows(db, "meeting_intelligence", [
+        (
+            version,
+            member["name"],
+            member["involvement_score"],
+            member["time_spoken_seconds"],
+            member["lines_spoken"],
+            member["behavior_type"],
+            json.dumps(member["important_topics"]),
+            member["summary"],
+            final_output["overall_meeting_summary"],
+            json.dumps(final_output["meeting_topics"]),
+            final_output["generated_at"]
+        )
+        for member in final_members
+    ])
+
+close_db()
 
 print(f"✅ Stored as meeting intelligence version v{version}")
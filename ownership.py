@@ -0,0 +1,141 @@
+import os
+import sys
+import glob
+import json
+import heapq
+import pandas as pd
+from operator import itemgetter
+
+# -------------------------
+# CODE OWNERSHIP INDEX
+# -------------------------
+# Lines changed per (path prefix, author), from the per-commit file lists that
+# github_export.py writes to commit_files.csv. Paths are stored as a prefix
+# tree with one node per directory / file, each holding the totals of
+# everything below it, so "top owners of app/core/" is a walk down a few
+# nodes plus a top-n over that node's authors.
+#
+# The tree is saved with the SHAs it already contains; each run only adds the
+# commits it has not seen (--rebuild to start over).
+
+DATA_DIR = "github_data"
+# Per-repo partitions written by github_data/multi_repo.py
+PARTITIONS_DIR = os.path.join(DATA_DIR, "repos")
+FILES_FILE = "commit_files.csv"
+OUTPUT_FILE = "ownership_tree.json"
+
+REBUILD = "--rebuild" in sys.argv
+
+
+def new_node():
+    return {"lines": 0, "authors": {}, "children": {}}
+
+
+def credit(node, author, lines):
+    node["lines"] += lines
+    node["authors"][author] = node["authors"].get(author, 0) + lines
+
+
+def split_path(prefix):
+    return [part for part in (prefix or "").strip("/").split("/") if part]
+
+
+class OwnershipTree:
+    def __init__(self, root=None, commits=()):
+        self.root = root or new_node()
+        self.commits = set(commits)
+
+    # ----- BUILD -----
+
+    def add(self, path, author, lines):
+        node = self.root
+        credit(node, author, lines)
+        for part in split_path(path):
+            child = node["children"].get(part)
+            if child is None:
+                child = node["children"][part] = new_node()
+            node = child
+            credit(node, author, lines)
+
+    def update(self, files):
+        """Add the commits of a commit_files frame (sha, user, path, changes) that are not in the tree yet."""
+        new = files[~files["sha"].isin(self.commits)]
+        # One walk per (file, author) rather than per commit
+        lines = pd.to_numeric(new["changes"], errors="coerce").fillna(0).astype("int64")
+        totals = lines.groupby([new["path"], new["user"]], sort=False).sum()
+        for (path, author), n in zip(totals.index, totals.tolist()):
+            self.add(path, author, n)
+        shas = set(new["sha"])
+        self.commits |= shas
+        return len(shas)
+
+    # ----- QUERIES -----
+
+    def find(self, prefix=""):
+        node = self.root
+        for part in split_path(prefix):
+            node = node["children"].get(part)
+            if node is None:
+                return None
+        return node
+
+    def top_owners(self, prefix="", n=5):
+        """[(author, lines)] of the n authors with the most changed lines under prefix."""
+        node = self.find(prefix)
+        if node is None:
+            return []
+        return heapq.nlargest(n, node["authors"].items(), key=itemgetter(1))
+
+    def children(self, prefix=""):
+        """[(name, lines)] directly under prefix, largest first."""
+        node = self.find(prefix)
+        if node is None:
+            return []
+        return sorted(((name, child["lines"]) for name, child in node["children"].items()),
+                      key=itemgetter(1), reverse=True)
+
+    # ----- STORAGE -----
+
+    def save(self, path=OUTPUT_FILE):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"commits": sorted(self.commits), "root": self.root}, f)
+
+    @classmethod
+    def load(cls, path=OUTPUT_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        return cls(saved["root"], saved["commits"])
+
+
+def load_files():
+    """Every repo partition's commit_files.csv (paths prefixed with the partition), or the single-repo export."""
+    paths = sorted(glob.glob(os.path.join(PARTITIONS_DIR, "*", FILES_FILE)))
+    if not paths:
+        single = os.path.join(DATA_DIR, FILES_FILE)
+        paths = [single] if os.path.exists(single) else []
+        partitioned = False
+    else:
+        partitioned = True
+
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, usecols=["sha", "user", "path", "changes"],
+                         dtype={"sha": str, "user": str, "path": str}, keep_default_na=False)
+        if partitioned:
+            df["path"] = os.path.basename(os.path.dirname(path)) + "/" + df["path"]
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["sha", "user", "path", "changes"])
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    tree = OwnershipTree() if REBUILD or not os.path.exists(OUTPUT_FILE) else OwnershipTree.load()
+
+    added = tree.update(load_files())
+    tree.save()
+
+    print(f"✅ Ownership tree updated: {added} new commits ({len(tree.commits)} total) -> {OUTPUT_FILE}")
+    for author, lines in tree.top_owners(n=5):
+        print(f"   {author}: {lines} lines")
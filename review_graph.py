@@ -0,0 +1,170 @@
+import os
+import glob
+import json
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# -------------------------
+# REVIEW NETWORK ANALYTICS
+# -------------------------
+# Who reviews whom, from the PR author -> reviewer pairs graphql_collector.py
+# writes to graphql_review_network.json. The graph is a sparse weighted
+# adjacency matrix (row = PR author, column = reviewer, value = reviews), so
+# everything below is a handful of sparse products and stays fast at 10k+
+# people:
+#   - centrality: PageRank, with review requests flowing author -> reviewer
+#   - reciprocity: share of a person's review partners who review them back
+#   - reviewer load: reviews given, and how unevenly they are spread (Gini)
+# collaboration (0-100) blends centrality and reciprocity; git_scoring.py
+# folds it into collaboration_health.
+
+DATA_DIR = "github_data"
+# Per-repo partitions written by github_data/multi_repo.py
+PARTITIONS_DIR = os.path.join(DATA_DIR, "repos")
+NETWORK_FILE = "graphql_review_network.json"
+OUTPUT_FILE = "review_graph.json"
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-10
+
+# collaboration = weight * centrality + (1 - weight) * reciprocity, both 0-100
+CENTRALITY_WEIGHT = 0.5
+
+
+def network_paths():
+    """Every repo partition's review network, or the single-repo export."""
+    paths = sorted(glob.glob(os.path.join(PARTITIONS_DIR, "*", NETWORK_FILE)))
+    if not paths:
+        single = os.path.join(DATA_DIR, NETWORK_FILE)
+        paths = [single] if os.path.exists(single) else []
+    return paths
+
+
+def load_edges(paths=None):
+    """One (author, reviewer) row per review; self-reviews and deleted accounts are dropped."""
+    pairs = []
+    for path in network_paths() if paths is None else paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        prs = (((data.get("data") or {}).get("repository") or {}).get("pullRequests") or {}).get("nodes") or []
+        for pr in prs:
+            author = (pr.get("author") or {}).get("login")
+            if not author:
+                continue
+            for review in (pr.get("reviews") or {}).get("nodes") or []:
+                reviewer = (review.get("author") or {}).get("login")
+                if reviewer and reviewer != author:
+                    pairs.append((author, reviewer))
+
+    return pd.DataFrame(pairs, columns=["author", "reviewer"])
+
+
+def gini(values):
+    """0 = everyone carries the same load, 1 = one person carries all of it."""
+    x = np.sort(values)
+    n = len(x)
+    if n == 0 or x.sum() == 0:
+        return 0.0
+    return float(2 * np.sum(np.arange(1, n + 1) * x) / (n * x.sum()) - (n + 1) / n)
+
+
+class ReviewGraph:
+    def __init__(self, edges):
+        codes, people = pd.factorize(pd.concat([edges["author"], edges["reviewer"]], ignore_index=True))
+        n, m = len(people), len(edges)
+
+        self.people = people
+        # Duplicate (author, reviewer) entries are summed into the review count
+        self.adjacency = sp.csr_matrix((np.ones(m), (codes[:m], codes[m:])), shape=(n, n))
+
+    def pagerank(self):
+        n = len(self.people)
+        if n == 0:
+            return np.zeros(0)
+
+        out_weight = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=out_weight > 0)
+        transition = (sp.diags(inverse) @ self.adjacency).T.tocsr()
+        dangling = out_weight == 0
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(MAX_ITERATIONS):
+            # Rank of people who never asked for a review is spread evenly
+            new = DAMPING * (transition @ rank + rank[dangling].sum() / n) + (1 - DAMPING) / n
+            converged = np.abs(new - rank).sum() < TOLERANCE
+            rank = new
+            if converged:
+                break
+        return rank
+
+    def reciprocity(self):
+        """Per person, and the graph-wide share of review links that go both ways."""
+        linked = (self.adjacency > 0).astype(np.int32)
+        mutual = linked.multiply(linked.T)
+        partners = np.asarray(((linked + linked.T) > 0).sum(axis=1)).ravel()
+        per_person = np.divide(
+            np.asarray(mutual.sum(axis=1)).ravel(), partners,
+            out=np.zeros(len(partners)), where=partners > 0
+        )
+        overall = mutual.nnz / linked.nnz if linked.nnz else 0.0
+        return per_person, overall
+
+    def metrics(self):
+        """Per-person metrics (one row per person, most central first) and graph-wide summary."""
+        rank = self.pagerank()
+        reciprocity, overall_reciprocity = self.reciprocity()
+        given = np.asarray(self.adjacency.sum(axis=0)).ravel()
+        received = np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+        top = rank.max() if len(rank) else 0
+        centrality = rank / top * 100 if top else rank
+        total_given = given.sum()
+
+        people = pd.DataFrame({
+            "name": self.people,
+            "pagerank": rank,
+            "centrality": centrality,
+            "reciprocity": reciprocity * 100,
+            "reviews_given": given.astype(np.int64),
+            "reviews_received": received.astype(np.int64),
+            "load_share": given / total_given * 100 if total_given else given,
+        })
+        people["collaboration"] = (
+            CENTRALITY_WEIGHT * people["centrality"] + (1 - CENTRALITY_WEIGHT) * people["reciprocity"]
+        )
+
+        # Reviewer load is measured over people who review at all
+        load = np.sort(given[given > 0])[::-1]
+        top_tenth = load[:max(1, len(load) // 10)].sum() / load.sum() * 100 if len(load) else 0.0
+        summary = {
+            "people": len(self.people),
+            "reviews": int(total_given),
+            "review_links": int(self.adjacency.nnz),
+            "reciprocity": round(overall_reciprocity * 100, 1),
+            "reviewers": int(len(load)),
+            "reviewer_load_gini": round(gini(load), 3),
+            "top_10pct_reviewer_share": round(float(top_tenth), 1)
+        }
+        return people.sort_values("pagerank", ascending=False, ignore_index=True), summary
+
+
+def collaboration_scores(paths=None):
+    """name -> collaboration (0-100) for everyone in the review network."""
+    people, _ = ReviewGraph(load_edges(paths)).metrics()
+    return people.set_index("name")["collaboration"]
+
+
+if __name__ == "__main__":
+    people, summary = ReviewGraph(load_edges()).metrics()
+
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "members": people.round(4).to_dict("records")}, f, indent=2)
+
+    print(f"✅ Review graph: {summary['people']} people, {summary['reviews']} reviews -> {OUTPUT_FILE}")
+    print(f"🔁 Reciprocity {summary['reciprocity']}% | reviewer load Gini {summary['reviewer_load_gini']} "
+          f"| top 10% of reviewers give {summary['top_10pct_reviewer_share']}% of reviews")
+    for row in people.head(5).itertuples():
+        print(f"   {row.name}: centrality {row.centrality:.1f}, collaboration {row.collaboration:.1f}")
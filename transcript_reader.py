@@ -0,0 +1,92 @@
+import re
+
+# Format: [12:34] username: sentence  (or [1:02:03] for meetings past the hour)
+LINE_PATTERN = re.compile(r"\[(\d+(?::\d+){1,2})\]\s*(.*?):\s*(.*)")
+
+# Per-speaker text kept for the AI prompt. phi3 truncates long prompts anyway,
+# and the cap keeps memory bounded by the number of speakers, not the meeting length.
+SPEECH_CHAR_BUDGET = 8000
+
+
+def to_seconds(stamp):
+    seconds = 0
+    for part in stamp.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def read_transcript(path):
+    """Yield (seconds, speaker, text) for every transcript line, one line at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            match = LINE_PATTERN.search(line)
+            if match:
+                stamp, speaker, text = match.groups()
+                yield to_seconds(stamp), speaker.strip(), text.strip()
+
+
+class SpeakerStats:
+    __slots__ = ("lines_spoken", "words", "texts", "chars")
+
+    def __init__(self):
+        self.lines_spoken = 0
+        self.words = 0
+        self.texts = []
+        self.chars = 0
+
+    def add(self, text):
+        self.lines_spoken += 1
+        self.words += len(text.split())
+        if self.chars < SPEECH_CHAR_BUDGET:
+            self.texts.append(text)
+            self.chars += len(text) + 1
+
+    @property
+    def full_text(self):
+        return " ".join(self.texts)
+
+
+def aggregate_speakers(records):
+    """Update per-speaker counters from a record stream. Returns ({speaker: SpeakerStats}, total_lines)."""
+    speakers = {}
+    total_lines = 0
+
+    for _, speaker, text in records:
+        stats = speakers.get(speaker)
+        if stats is None:
+            stats = speakers[speaker] = SpeakerStats()
+        stats.add(text)
+        total_lines += 1
+
+    return speakers, total_lines
+
+
+def format_stamp(seconds):
+    hours, rest = divmod(seconds, 3600)
+    if hours:
+        return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+    return f"{rest // 60:02d}:{rest % 60:02d}"
+
+
+def chunk_transcript(records, window_seconds, max_words):
+    """Group a record stream into transcript chunks of at most window_seconds and max_words.
+
+    Boundaries depend only on the lines before them, so appending to a
+    transcript leaves earlier chunks (and their cached summaries) unchanged.
+    """
+    lines = []
+    words = 0
+    start = None
+
+    for seconds, speaker, text in records:
+        n = len(text.split())
+        if lines and (seconds - start >= window_seconds or words + n > max_words):
+            yield "\n".join(lines)
+            lines, words = [], 0
+        if not lines:
+            start = seconds
+        lines.append(f"[{format_stamp(seconds)}] {speaker}: {text}")
+        words += n
+
+    if lines:
+        yield "\n".join(lines)
@@ -0,0 +1,287 @@
+import os
+import sys
+import glob
+import json
+from datetime import datetime
+from db_engine import get_db, transaction, begin_run, close_db
+from git_scoring import COLLABORATION_WEIGHT
+from review_graph import collaboration_scores
+
+# --------------------------
+# WAREHOUSE MODE
+# --------------------------
+# Loads the raw GitHub CSVs straight into DuckDB and computes the git and fusion
+# scores as SQL views, materialised per version. Replaces the
+# CSV -> git_analyser.py -> JSON -> fusion.py -> DB round trip; pass
+# --export-json to still write git_intelligence.json / final_team_intelligence.json.
+
+DATA_DIR = "github_data"
+PARTITIONS_DIR = os.path.join(DATA_DIR, "repos")
+GIT_FILE = "git_intelligence.json"
+OUTPUT_FILE = "final_team_intelligence.json"
+
+EXPORT_JSON = "--export-json" in sys.argv
+
+# Read the Parquet lake written by github_export.py instead of the CSVs
+FROM_PARQUET = "--from-parquet" in sys.argv
+LAKE_DIR = os.path.join(DATA_DIR, "data_lake")
+
+RAW_TABLES = {
+    "raw_commits": "commits.csv",
+    "raw_prs": "pull_requests.csv",
+    "raw_reviews": "reviews.csv",
+}
+
+# Same formulas as git_scoring.py. Work importance is summed in whole 1/40 units,
+# so it is the exact value (the Python loop's accumulated float error can tip
+# an x.x5 tie the other way when rounding). People in the review network
+# (raw_collaboration) get the review-graph bonus added to collaboration_health.
+GIT_SCORES_VIEW = f"""
+CREATE OR REPLACE VIEW git_scores_v AS
+WITH users AS (
+    SELECT "user" AS name FROM raw_commits
+    UNION SELECT "user" FROM raw_prs
+    UNION SELECT reviewer FROM raw_reviews
+),
+c AS (
+    SELECT "user" AS name,
+           COUNT(*) AS n_commits,
+           SUM(CAST(core_files AS BIGINT) * 3 + CAST(files_changed AS BIGINT)) * 40
+             + SUM(LEAST(CAST(total_changes AS BIGINT), 400)) AS importance_40ths
+    FROM raw_commits GROUP BY 1
+),
+p AS (
+    SELECT "user" AS name,
+           COUNT(*) AS n_prs,
+           COUNT(*) FILTER (WHERE merged = 'False') AS blocked
+    FROM raw_prs GROUP BY 1
+),
+r AS (
+    SELECT reviewer AS name,
+           COUNT(*) FILTER (WHERE state = 'APPROVED') AS approvals,
+           COUNT(*) FILTER (WHERE state = 'CHANGES_REQUESTED') AS changes
+    FROM raw_reviews GROUP BY 1
+),
+counts AS (
+    SELECT u.name,
+           COALESCE(c.n_commits, 0) AS n_commits,
+           COALESCE(c.importance_40ths, 0) AS importance_40ths,
+           COALESCE(p.n_prs, 0) AS n_prs,
+           COALESCE(p.blocked, 0) AS blocked,
+           COALESCE(r.approvals, 0) AS approvals,
+           COALESCE(r.changes, 0) AS changes,
+           k.collaboration
+    FROM users u
+    LEFT JOIN c ON c.name = u.name
+    LEFT JOIN p ON p.name = u.name
+    LEFT JOIN r ON r.name = u.name
+    LEFT JOIN raw_collaboration k ON k.name = u.name
+),
+scores AS (
+    SELECT name,
+           LEAST(100, importance_40ths / 40.0) AS work_importance,
+           COALESCE(n_prs / NULLIF(MAX(n_prs) OVER (), 0) * 100, 0) AS pr_involvement,
+           LEAST(100, approvals * 20 + changes * 10) AS comment_quality,
+           COALESCE(n_commits / NULLIF(MAX(n_commits) OVER (), 0) * 100, 0) AS activity,
+           CASE WHEN collaboration IS NULL THEN GREATEST(0, 100 - blocked * 20)
+                ELSE GREATEST(0, 100 - blocked * 20) + (100 - GREATEST(0, 100 - blocked * 20))
+                     * (collaboration * CAST({COLLABORATION_WEIGHT!r} AS DOUBLE) / 100)
+           END AS collaboration_health
+    FROM counts
+)
+SELECT name,
+       ROUND(work_importance, 1) AS work_importance,
+       ROUND(pr_involvement, 1) AS pr_involvement,
+       ROUND(comment_quality, 1) AS comment_quality,
+       ROUND(activity, 1) AS activity,
+       ROUND(collaboration_health, 1) AS collaboration_health,
+       ROUND(work_importance * 0.35 + pr_involvement * 0.25 + comment_quality * 0.2
+             + activity * 0.1 + collaboration_health * 0.1, 1) AS git_score,
+       CASE
+           WHEN work_importance > 70 AND activity < 50 THEN 'Silent Architect'
+           WHEN work_importance > 60 AND collaboration_health < 50 THEN 'Firefighter'
+           WHEN comment_quality > 60 AND collaboration_health > 60 THEN 'Mentor'
+           WHEN activity > 70 AND work_importance < 50 THEN 'Noisy Contributor'
+           WHEN pr_involvement > 50 AND collaboration_health > 60 THEN 'Coordinator'
+           ELSE 'Observer'
+       END AS git_behavior
+FROM scores
+"""
+
+# Same rules as fusion.py, against the latest meeting version in the database
+FUSION_VIEW = """
+CREATE OR REPLACE VIEW fusion_v AS
+WITH meet AS (
+    SELECT lower(name) AS name, involvement_score AS meeting_score, behavior_type AS meeting_role
+    FROM meeting_intelligence
+    WHERE version = (SELECT MAX(version) FROM meeting_intelligence)
+),
+g AS (
+    SELECT lower(name) AS name, git_score, git_behavior AS git_role FROM git_scores_v
+),
+joined AS (
+    SELECT COALESCE(meet.name, g.name) AS name,
+           COALESCE(meet.meeting_score, 0) AS meeting_score,
+           COALESCE(g.git_score, 0) AS git_score,
+           COALESCE(meet.meeting_role, 'Observer') AS meeting_role,
+           COALESCE(g.git_role, 'Observer') AS git_role,
+           ROUND(COALESCE(meet.meeting_score, 0) * 0.4 + COALESCE(g.git_score, 0) * 0.6, 2) AS merged_score
+    FROM meet FULL OUTER JOIN g ON meet.name = g.name
+)
+SELECT name,
+       merged_score,
+       CASE
+           WHEN 'Silent Architect' IN (meeting_role, git_role) AND merged_score > 55 THEN 'Silent Architect'
+           WHEN 'Firefighter' IN (meeting_role, git_role) AND git_score > 50 THEN 'Firefighter'
+           WHEN 'Mentor' IN (meeting_role, git_role) AND meeting_score > 25 THEN 'Mentor'
+           WHEN 'Coordinator' IN (meeting_role, git_role) AND merged_score > 40 THEN 'Coordinator'
+           WHEN meeting_score > 50 AND git_score < 30 THEN 'Noisy Contributor'
+           ELSE 'Observer'
+       END AS final_behavior,
+       git_score,
+       meeting_score
+FROM joined
+"""
+
+
+def dataset_paths(filename):
+    """Every repo partition of a dataset, or the single-repo export if there are none."""
+    paths = sorted(glob.glob(os.path.join(PARTITIONS_DIR, "*", filename)))
+    return paths or [os.path.join(DATA_DIR, filename)]
+
+
+# Lake datasets are appended to on every sync; keep the newest copy of each row.
+# Reviews are rewritten per PR, so a PR's reviews all come from its latest sync.
+# Only the columns GIT_SCORES_VIEW uses are selected, so Parquet reads no others
+# beyond the ones the window needs.
+LAKE_TABLES = {
+    "raw_commits": (
+        "commits", '"user", core_files, files_changed, total_changes',
+        "PARTITION BY repo, sha ORDER BY synced_at DESC", "row_number() OVER w = 1"
+    ),
+    "raw_prs": (
+        "pull_requests", '"user", merged',
+        "PARTITION BY repo, number ORDER BY synced_at DESC", "row_number() OVER w = 1"
+    ),
+    "raw_reviews": (
+        "reviews", "reviewer, state",
+        "PARTITION BY repo, pr_number", "synced_at = max(synced_at) OVER w"
+    ),
+}
+
+
+def load_raw(db):
+    if FROM_PARQUET:
+        return load_raw_parquet(db)
+
+    for table, filename in RAW_TABLES.items():
+        paths = ", ".join("'" + p.replace("'", "''") + "'" for p in dataset_paths(filename))
+        db.execute(f"""
+            CREATE OR REPLACE TABLE {table} AS
+            SELECT * FROM read_csv_auto([{paths}], all_varchar = true, union_by_name = true)
+        """)
+
+
+def load_collaboration(db):
+    """Review-network collaboration signal (review_graph.py) as raw_collaboration(name, collaboration)."""
+    collab = collaboration_scores().rename_axis("name").reset_index()
+    collab = collab.astype({"name": "string", "collaboration": "float64"})
+    db.register("collaboration_df", collab)
+    try:
+        db.execute("CREATE OR REPLACE TABLE raw_collaboration AS SELECT * FROM collaboration_df")
+    finally:
+        db.unregister("collaboration_df")
+
+
+def load_raw_parquet(db):
+    for table, (dataset, columns, window, keep) in LAKE_TABLES.items():
+        pattern = os.path.join(LAKE_DIR, dataset, "**", "*.parquet").replace("'", "''")
+        db.execute(f"""
+            CREATE OR REPLACE TABLE {table} AS
+            SELECT {columns}
+            FROM read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)
+            WINDOW w AS ({window})
+            QUALIFY {keep}
+        """)
+
+
+def materialise(generated_at):
+    with transaction() as db:
+        version = begin_run(db, "warehouse")
+
+        db.execute("""
+            INSERT INTO git_intelligence
+            SELECT ?, name, work_importance, pr_involvement, comment_quality, activity,
+                   collaboration_health, git_score, git_behavior, ?
+            FROM git_scores_v
+        """, (version, generated_at))
+
+        db.execute("""
+            INSERT INTO final_team_intelligence
+            SELECT ?, name, merged_score, final_behavior, git_score, meeting_score, ?
+            FROM fusion_v
+        """, (version, generated_at))
+
+    return version
+
+
+def export_json(db, version, generated_at):
+    git_rows = db.execute("""
+        SELECT name, work_importance, pr_involvement, comment_quality, activity,
+               collaboration_health, git_score, git_behavior
+        FROM git_intelligence WHERE version = ? ORDER BY git_score DESC
+    """, (version,)).fetchall()
+
+    with open(GIT_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": generated_at,
+            "members": [{
+                "name": r[0],
+                "git_scores": {
+                    "work_importance": r[1],
+                    "pr_involvement": r[2],
+                    "comment_quality": r[3],
+                    "activity": r[4],
+                    "collaboration_health": r[5],
+                    "git_score": r[6]
+                },
+                "git_behavior": r[7]
+            } for r in git_rows]
+        }, f, indent=2)
+
+    final_rows = db.execute("""
+        SELECT name, merged_score, final_behavior, git_score, meeting_score
+        FROM final_team_intelligence WHERE version = ? ORDER BY merged_score DESC
+    """, (version,)).fetchall()
+
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": generated_at,
+            "members": [{
+                "name": r[0],
+                "merged_score": r[1],
+                "final_behavior": r[2],
+                "git_score": r[3],
+                "meeting_score": r[4]
+            } for r in final_rows]
+        }, f, indent=2)
+
+
+if __name__ == "__main__":
+    db = get_db()
+    generated_at = datetime.now().isoformat()
+
+    print("🗄️ Loading raw GitHub data into DuckDB...")
+    load_raw(db)
+    load_collaboration(db)
+    db.execute(GIT_SCORES_VIEW)
+    db.execute(FUSION_VIEW)
+
+    version = materialise(generated_at)
+    print(f"📦 Git + fusion scores materialised as version v{version}")
+
+    if EXPORT_JSON:
+        export_json(db, version, generated_at)
+        print("✅ JSON exports written:", GIT_FILE, OUTPUT_FILE)
+
+    close_db()
@@ -1,9 +1,11 @@
 import streamlit as st
-import json
 import pandas as pd
 import plotly.express as px
 import os
-import random
+import dashboard_queries as q
+from db_engine import DB_FILE, DatabaseBusy
+from ownership import OwnershipTree, OUTPUT_FILE as OWNERSHIP_FILE
+from bus_factor import COVERAGE
 
 # --- 1. CONFIG & CUSTOM CSS ---
 st.set_page_config(page_title="Manager HQ", layout="wide", page_icon="⚡")
@@ -60,122 +62,111 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 2. DATA LOADING & TRANSFORMATION ---
-
-# A. Team Data Loader
-def load_and_process_data():
-    file_path = 'final_team_intelligence.json'
-    
-    # Default Dummy Data
-    raw_data = [
-        {"name": "yaswanth1976", "merged_score": 4.56, "final_behavior": "Observer", "git_score": 7.6, "meeting_score": 2.0},
-        {"name": "alex_dev", "merged_score": 8.5, "final_behavior": "Silent Architect", "git_score": 9.2, "meeting_score": 1.0}
-    ]
-
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r') as f:
-                loaded_json = json.load(f)
-                if isinstance(loaded_json, dict):
-                    if "members" in loaded_json and isinstance(loaded_json["members"], list):
-                        raw_data = loaded_json["members"]
-                    else:
-                        temp_list = []
-                        for key, value in loaded_json.items():
-                            if isinstance(value, dict):
-                                if 'name' not in value:
-                                    value['name'] = key
-                                temp_list.append(value)
-                        raw_data = temp_list
-                elif isinstance(loaded_json, list):
-                    raw_data = loaded_json
-        except Exception as e:
-            st.error(f"Error reading JSON: {e}")
-
-    processed_members = []
-    valid_data = [x for x in raw_data if isinstance(x, dict)]
-    sorted_data = sorted(valid_data, key=lambda x: x.get('merged_score', 0), reverse=True)
-
-    for idx, item in enumerate(sorted_data):
-        impact_val = float(item.get('git_score', 0)) * 10
-        activity_val = float(item.get('meeting_score', 0)) * 10
-        score_val = float(item.get('merged_score', 0)) * 10 
-        member_name = item.get('name', f"Member {idx+1}")
-
-        member = {
-            "id": idx + 1,
-            "name": member_name,
-            "role": "Contributor", 
-            "category": item.get('final_behavior', 'Contributor'),
-            "impact": impact_val,  
-            "activity": activity_val, 
-            "rank": idx + 1,
-            "score": score_val
-        }
-        processed_members.append(member)
-
-    fastapi_components = [
-        "app/main.py", "app/api/v1/endpoints/auth.py", "app/api/v1/endpoints/users.py",
-        "app/api/v1/endpoints/items.py", "app/core/config.py", "app/core/security.py",
-        "app/db/session.py", "app/db/base.py", "app/models/user.py", "app/schemas/token.py",
-        "app/services/email.py", "tests/test_api.py", "Dockerfile"
-    ]
-    
-    project_structure = []
-    if processed_members:
-        for comp in fastapi_components:
-            count = random.randint(1, min(3, len(processed_members)))
-            assigned_members = random.sample([m['name'] for m in processed_members], count)
-            project_structure.append({"component": comp, "members": assigned_members})
-
-    teams = [
+# --- 2. DATA ACCESS (DuckDB) ---
+# Team and meeting intelligence are read from hacknox.db, one version at a time.
+# Filtering, ranking and paging run as SQL (dashboard_queries.py), so only the
+# rows on screen reach Streamlit. A written version never changes, so results
+# are cached per version; only the version list is re-read to pick up new runs.
+
+PAGE_SIZE = 50        # rows per page in the member and risk tables
+BOX_LIMIT = 10        # names listed per Hidden Contributors box
+NAMES_PER_ROLE = 15   # names listed per role in Contribution Roles
+SCATTER_LABELS = 100  # label scatter points only up to this many members
+COMPONENTS = 15       # largest paths listed under the chosen prefix
+OWNERS = 4            # top owners shown per path
+
+@st.cache_data(show_spinner=False, ttl=10)
+def load_versions():
+    return q.list_versions()
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def member_count(version, category=None, search=None, pattern=None):
+    return q.count_members(version, category, search, pattern)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def member_rows(version, category=None, search=None, pattern=None, limit=PAGE_SIZE, offset=0):
+    return q.member_page(version, category, search, pattern, limit, offset)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def role_counts(version):
+    return q.category_counts(version)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def role_names(version, per_role):
+    return q.top_by_category(version, per_role).groupby('category')['name'].apply(list).to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def scatter_data(version):
+    return q.scatter_points(version)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def extremes(version):
+    return q.score_extremes(version)
+
+# Bus factor is precomputed per version by bus_factor.py
+@st.cache_data(show_spinner=False, max_entries=8)
+def bus_factor_version(version):
+    return q.version_for("bus_factor", version)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def bus_factor_summary(bf_version):
+    return q.bus_factor_summary(bf_version), q.count_knowledge_risk(bf_version)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def knowledge_risk_rows(bf_version, limit, offset):
+    return q.knowledge_risk_page(bf_version, limit, offset)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def module_risk_rows(bf_version, limit, offset):
+    return q.risky_modules(bf_version, limit, offset)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_meeting_data(version):
+    meeting_version = q.meeting_version_for(version)
+    if meeting_version is None:
+        return {}, pd.DataFrame()
+    return q.meeting_overview(meeting_version), q.meeting_members(meeting_version)
+
+# Ownership tree from ownership.py; shared (not copied) between reruns and
+# reloaded when the file changes
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_ownership(file_path, version):
+    return OwnershipTree.load(file_path) if version is not None else None
+
+def file_version(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+def load_teams(version):
+    size = member_count(version) if version is not None else 0
+    return [
         {
             "id": "t1",
             "name": "Alpha Squad",
-            "size": len(processed_members),
+            "size": size,
             "description": "Core Backend & Infrastructure (FastAPI)",
-            "members": processed_members,
-            "projectStructure": project_structure
+            "hasStructure": True
         },
         {
             "id": "t2",
             "name": "Beta Design",
             "size": 0,
             "description": "Frontend & UX (Empty)",
-            "members": [],
-            "projectStructure": []
+            "hasStructure": False
         }
     ]
-    return {"teams": teams}
 
-# B. Meeting Data Loader
-def load_meeting_data():
-    file_path = 'meeting_intelligence.json'
-    
-    # RAW DATA FROM PROMPT
-    raw_meeting_data = """
-    {
-      "overall_meeting_summary": "Meeting focused on platform stability, authentication risks, Kubernetes restarts, API reliability, and security improvements.",
-      "meeting_topics": ["authentication", "kubernetes stability", "security", "API management", "performance"],
-      "member_analysis": [],
-      "dominant_speakers": ["hasansezertasan", "Kludex", "tiangolo"],
-      "silent_speakers": ["pre-commit-ci[bot]", "dmontagu", "dependabot[bot]"]
-    }
-    """
-    
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except:
-            return json.loads(raw_meeting_data)
-    else:
-        return json.loads(raw_meeting_data)
+try:
+    versions = load_versions()
+    st.session_state.versions = versions
+except DatabaseBusy:
+    # A pipeline step holds the database; keep showing what this session last read
+    versions = st.session_state.get('versions', [])
+    st.sidebar.info("⏳ The pipeline is writing new data; showing the versions loaded earlier.")
+except Exception as e:
+    st.error(f"Error reading {DB_FILE}: {e}")
+    versions = []
 
 
-data = load_and_process_data()
-meeting_data = load_meeting_data()
-
 # --- 3. STATE MANAGEMENT ---
 if 'page' not in st.session_state:
     st.session_state.page = 'login'
@@ -185,7 +176,19 @@ if 'selected_team' not in st.session_state:
 def navigate_to(page, team=None):
     st.session_state.page = page
     if team:
-        st.session_state.selected_team = team
+        # Keep the id only, so a reload after a new pipeline run shows fresh data
+        st.session_state.selected_team = team['id']
+
+# Newest version unless the manager picks an older run
+version = None
+if versions and st.session_state.page != 'login':
+    generated = dict(versions)
+    version = st.sidebar.selectbox(
+        "📦 Data Version", [v for v, _ in versions],
+        format_func=lambda v: f"v{v} · {generated[v]:%Y-%m-%d %H:%M}" if generated[v] else f"v{v}"
+    )
+elif versions:
+    version = versions[0][0]
 
 # --- 4. VIEWS ---
 
@@ -214,7 +217,7 @@ def manager_home_view():
     st.markdown("<h1>Welcome back, Manager 👋</h1>", unsafe_allow_html=True)
     st.markdown("<p style='color:#aaa; margin-bottom: 30px;'>Select a team to analyze performance and structure.</p>", unsafe_allow_html=True)
     
-    teams = data['teams']
+    teams = load_teams(version)
     col1, col2 = st.columns(2)
     
     with col1:
@@ -249,7 +252,7 @@ def manager_home_view():
 
 # === TEAM DASHBOARD ===
 def team_dashboard_view():
-    team = st.session_state.selected_team
+    team = next(t for t in load_teams(version) if t['id'] == st.session_state.selected_team)
     
     c1, c2 = st.columns([6, 1])
     with c1:
@@ -270,17 +273,18 @@ def team_dashboard_view():
         "🚀 Performance & Risk" # <--- NEW TAB
     ])
     
-    df = pd.DataFrame(team['members'])
+    # Queries below only cover the team's version of the data
+    empty = team['size'] == 0
     
-    # ... Tabs 1-5 Logic (Unchanged) ...
     with tab1:
         st.markdown("### High-Impact Categories")
-        if df.empty:
+        if empty:
             st.warning("No members data available.")
         else:
             col_a, col_b, col_c = st.columns(3)
             def render_box(col, title, target_string, color, icon):
-                filtered = df[df['category'].astype(str).str.contains(target_string, case=False, na=False)]
+                total = member_count(version, pattern=target_string)
+                filtered = member_rows(version, pattern=target_string, limit=BOX_LIMIT)
                 with col:
                     st.markdown(f"""
                     <div class="glass-card" style="border-top: 4px solid {color}; height: 100%;">
@@ -288,8 +292,9 @@ def team_dashboard_view():
                     </div>
                     """, unsafe_allow_html=True)
                     if not filtered.empty:
-                        for _, row in filtered.iterrows():
-                            st.markdown(f"**{row['name']}**", unsafe_allow_html=True)
+                        st.markdown("\n\n".join(f"**{name}**" for name in filtered['name']), unsafe_allow_html=True)
+                        if total > BOX_LIMIT:
+                            st.caption(f"+ {total - BOX_LIMIT} more (see Team Members)")
                     else:
                         st.caption("No members found.")
             render_box(col_a, "Silent Architects", "Architect", "#818cf8", "🧠")
@@ -297,16 +302,20 @@ def team_dashboard_view():
             render_box(col_c, "Firefighters", "Firefighter", "#fbbf24", "🔥")
 
     with tab2:
-        if not df.empty:
-            c_search, c_filter = st.columns([3, 1])
+        if not empty:
+            c_search, c_filter, c_page = st.columns([3, 1, 1])
             search_term = c_search.text_input("🔍 Search", placeholder="Name...")
-            unique_cats = list(df['category'].astype(str).unique())
+            unique_cats = [cat for cat, _ in role_counts(version)]
             cat_filter = c_filter.selectbox("Filter Behavior", ["All"] + unique_cats)
-            display_df = df.copy()
-            if search_term:
-                display_df = display_df[display_df['name'].str.contains(search_term, case=False)]
-            if cat_filter != "All":
-                display_df = display_df[display_df['category'] == cat_filter]
+            category = None if cat_filter == "All" else cat_filter
+
+            total = member_count(version, category, search_term)
+            pages = max(1, -(-total // PAGE_SIZE))
+            # No key: a new filter gives a new widget, which starts back at page 1
+            page = c_page.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+            offset = (page - 1) * PAGE_SIZE
+            display_df = member_rows(version, category, search_term, None, PAGE_SIZE, offset)
+            st.caption(f"Showing {min(offset + 1, total)}–{offset + len(display_df)} of {total} members")
             st.dataframe(
                 display_df[['rank', 'name', 'category', 'score']],
                 use_container_width=True, hide_index=True,
@@ -317,42 +326,53 @@ def team_dashboard_view():
 
     with tab3:
         st.markdown("### ⚡ FastAPI Project Structure")
-        structure = team.get('projectStructure', [])
-        if structure:
-            for item in structure:
-                with st.expander(f"📂 {item['component']}", expanded=False):
-                    st.markdown("**Assigned Contributors:**")
-                    cols = st.columns(4)
-                    for i, member in enumerate(item['members']):
-                        cols[i % 4].markdown(f"""
-                        <div style="background: rgba(99, 102, 241, 0.2); color: #a5b4fc; padding: 5px 10px; border-radius: 20px; text-align: center; font-size: 0.9rem; border: 1px solid rgba(99, 102, 241, 0.3);">
-                           {member}
-                        </div>""", unsafe_allow_html=True)
+        tree = load_ownership(OWNERSHIP_FILE, file_version(OWNERSHIP_FILE)) if team['hasStructure'] else None
+        if tree is not None:
+            # Owners = authors with the most changed lines under a path
+            prefix = st.text_input("📂 Path prefix", placeholder="app/core").strip().strip("/")
+            if tree.find(prefix) is None:
+                st.warning(f"No commits touched '{prefix}'.")
+            else:
+                owners = ", ".join(f"**{a}** ({n})" for a, n in tree.top_owners(prefix, OWNERS))
+                st.markdown(f"Top owners of `{prefix or '/'}`: {owners}")
+                for name, lines in tree.children(prefix)[:COMPONENTS]:
+                    path = f"{prefix}/{name}" if prefix else name
+                    with st.expander(f"📂 {path} · {lines} lines changed", expanded=False):
+                        st.markdown("**Top Owners:**")
+                        cols = st.columns(OWNERS)
+                        for i, (member, member_lines) in enumerate(tree.top_owners(path, OWNERS)):
+                            cols[i % OWNERS].markdown(f"""
+                            <div style="background: rgba(99, 102, 241, 0.2); color: #a5b4fc; padding: 5px 10px; border-radius: 20px; text-align: center; font-size: 0.9rem; border: 1px solid rgba(99, 102, 241, 0.3);">
+                               {member} · {member_lines}
+                            </div>""", unsafe_allow_html=True)
         else:
-            st.info("No structure generated.")
+            st.info("No ownership data yet. Run ownership.py after github_export.py.")
 
     with tab4:
         st.markdown("### Behavioral Distribution")
-        if not df.empty:
-            categories = df['category'].unique()
+        if not empty:
+            names = role_names(version, NAMES_PER_ROLE)
             cols = st.columns(3)
-            for idx, cat in enumerate(categories):
-                filtered = df[df['category'] == cat]
+            for idx, (cat, count) in enumerate(role_counts(version)):
                 with cols[idx % 3]:
                     st.markdown(f"""
                     <div class="glass-card">
                         <div style="display:flex; justify-content:space-between;">
-                            <b>{cat}</b> <span style="background:rgba(255,255,255,0.1); padding:0 6px; border-radius:4px;">{len(filtered)}</span>
+                            <b>{cat}</b> <span style="background:rgba(255,255,255,0.1); padding:0 6px; border-radius:4px;">{count}</span>
                         </div><hr style="border-color:rgba(255,255,255,0.1)">
                     </div>""", unsafe_allow_html=True)
-                    for name in filtered['name']:
+                    for name in names.get(cat, []):
                         cols[idx % 3].markdown(f"<small style='color:#ccc'>• {name}</small>", unsafe_allow_html=True)
+                    if count > NAMES_PER_ROLE:
+                        cols[idx % 3].caption(f"+ {count - NAMES_PER_ROLE} more")
 
     with tab5:
-        if not df.empty:
+        if not empty:
+            points = scatter_data(version)
             st.markdown(f"**X-Axis:** Meeting Score (Active) | **Y-Axis:** Git Score (Impact)")
             fig = px.scatter(
-                df, x="activity", y="impact", text="name", hover_data=["category", "score"],
+                points, x="activity", y="impact", hover_name="name", hover_data=["category", "score"],
+                text="name" if len(points) <= SCATTER_LABELS else None,
                 color="category", template="plotly_dark", title="Activity vs Impact"
             )
             fig.add_hline(y=50, line_dash="dot", line_color="grey")
@@ -363,6 +383,7 @@ def team_dashboard_view():
 
     with tab6:
         st.markdown("### 🎙️ Sprint Retrospective / Meeting Summary")
+        meeting_data, m_df = load_meeting_data(version) if version is not None else ({}, pd.DataFrame())
         
         st.markdown(f"""
         <div class="glass-card">
@@ -379,9 +400,7 @@ def team_dashboard_view():
                 topics_html += f"<span class='topic-badge'>{topic}</span>"
             st.markdown(f"<div style='margin-bottom: 20px;'>{topics_html}</div>", unsafe_allow_html=True)
 
-            members_data = meeting_data.get('member_analysis', [])
-            if members_data:
-                m_df = pd.DataFrame(members_data)
+            if not m_df.empty:
                 fig_spoken = px.bar(
                     m_df.sort_values('time_spoken_seconds', ascending=True), 
                     x='time_spoken_seconds', y='name', 
@@ -411,7 +430,7 @@ def team_dashboard_view():
                 </div>""", unsafe_allow_html=True)
 
         st.markdown("#### 📋 Detailed Member Analysis")
-        if members_data:
+        if not m_df.empty:
             m_df['important_topics_str'] = m_df['important_topics'].apply(lambda x: ", ".join(x[:3]) + ("..." if len(x)>3 else ""))
             st.dataframe(
                 m_df[['name', 'behavior_type', 'time_spoken_seconds', 'involvement_score', 'lines_spoken', 'important_topics_str', 'summary']],
@@ -426,19 +445,12 @@ def team_dashboard_view():
 
     # --- TAB 7: PERFORMANCE & RISK (NEW) ---
     with tab7:
-        if df.empty:
+        if empty:
             st.warning("No data for performance analysis.")
         else:
-            # 1. CALCULATE STATISTICS
-            # Company Dependency Metric: (Score / Total Team Score) * 100
-            total_team_score = df['score'].sum()
-            df['dependency_risk'] = (df['score'] / total_team_score) * 100
-            
-            # Identify Hike Candidate (Highest Score)
-            hike_candidate = df.loc[df['score'].idxmax()]
-            
-            # Identify Fire Candidate (Lowest Score)
-            fire_candidate = df.loc[df['score'].idxmin()]
+            # 1. CALCULATE STATISTICS (in SQL)
+            # Hike Candidate (Highest Score) and Fire Candidate (Lowest Score)
+            hike_candidate, fire_candidate = extremes(version)
             
             st.markdown("### 📊 AI Performance Decisions")
             st.markdown("Analysis based on Impact (Git) + Activity (Meeting) scores.")
@@ -488,10 +500,24 @@ def team_dashboard_view():
 
             # 3. DEPARTURE RISK TABLE ("If this person leaves...")
             st.markdown("### 📉 Company Loss Impact (Bus Factor)")
-            st.markdown("Percentage of team capability lost if this person leaves the company.")
-            
-            # Format dataframe for display
-            risk_df = df[['name', 'category', 'score', 'dependency_risk']].sort_values('dependency_risk', ascending=False)
+            bf_version = bus_factor_version(version)
+            if bf_version is None:
+                st.info("No bus factor data yet. Run bus_factor.py after github_export.py.")
+                return
+
+            summary, at_risk = bus_factor_summary(bf_version)
+            files, single_files = summary.get('file', (0, 0))
+            modules, single_modules = summary.get('module', (0, 0))
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Team Truck Factor", summary['truck_factor'] or 0,
+                      help=f"Fewest people who wrote {int(COVERAGE * 100)}% of all changed lines: {', '.join(summary['key_people'][:10])}")
+            m2.metric("Single-Owner Files", f"{single_files} / {files}")
+            m3.metric("Single-Owner Modules", f"{single_modules} / {modules}")
+
+            st.markdown("Percentage of the codebase only this person knows (files with a bus factor of 1) - lost if they leave the company.")
+            pages = max(1, -(-at_risk // PAGE_SIZE))
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="risk_page")
+            risk_df = knowledge_risk_rows(bf_version, PAGE_SIZE, (page - 1) * PAGE_SIZE)
             
             st.dataframe(
                 risk_df,
@@ -499,22 +525,44 @@ def team_dashboard_view():
                 hide_index=True,
                 column_config={
                     "name": "Employee Name",
-                    "category": "Role",
-                    "score": st.column_config.NumberColumn("Work Efficiency", format="%d"),
-                    "dependency_risk": st.column_config.ProgressColumn(
+                    "sole_owned_files": st.column_config.NumberColumn("Sole-Owned Files", format="%d"),
+                    "lines_at_risk": st.column_config.NumberColumn("Lines Only They Know", format="%d"),
+                    "loss_pct": st.column_config.ProgressColumn(
                         "Company Loss % if Left",
                         format="%.1f%%",
                         min_value=0,
-                        max_value=100, # Relative to total team score
-                        help="Calculated based on contribution to total team velocity."
+                        max_value=100, # Relative to all changed lines
+                        help="Share of changed lines in files where this person is the only key person."
                     )
                 }
             )
 
+            st.markdown("### 🧱 Riskiest Modules")
+            pages = max(1, -(-modules // PAGE_SIZE))
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="module_page")
+            st.dataframe(
+                module_risk_rows(bf_version, PAGE_SIZE, (page - 1) * PAGE_SIZE),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "module": "Module",
+                    "bus_factor": st.column_config.NumberColumn("Bus Factor", format="%d"),
+                    "authors": st.column_config.NumberColumn("Authors", format="%d"),
+                    "total_lines": st.column_config.NumberColumn("Lines Changed", format="%d"),
+                    "key_people": "Key People",
+                    "top_share": st.column_config.ProgressColumn("Top Author Share", format="%.0f%%", min_value=0, max_value=100)
+                }
+            )
+
 # --- ROUTER ---
-if st.session_state.page == 'login':
-    login_view()
-elif st.session_state.page == 'manager_home':
-    manager_home_view()
-elif st.session_state.page == 'team_dashboard':
-    team_dashboard_view()
\ No newline at end of file
+# Results already read are cached per version, so only data not loaded before
+# can hit a locked database
+try:
+    if st.session_state.page == 'login':
+        login_view()
+    elif st.session_state.page == 'manager_home':
+        manager_home_view()
+    elif st.session_state.page == 'team_dashboard':
+        team_dashboard_view()
+except DatabaseBusy:
+    st.warning("⏳ The pipeline is writing new data right now. This view will load once it finishes; refresh in a moment.")
\ No newline at end of file
@@ -9,18 +9,25 @@ TARGET_HOUR = 9
 TARGET_MINUTE = 30
 SUB_DIR = "github_data"
 
+# Compute git + fusion scores as SQL inside DuckDB (warehouse.py) instead of
+# git_analyser.py -> JSON -> fusion.py
+WAREHOUSE_MODE = False
+
 # List of scripts in execution order
 SCRIPTS = [
     ("github_export.py", SUB_DIR),
-    ("graphql_pr_intelligence.py", SUB_DIR),
-    ("graphql_commit.py", SUB_DIR),
-    ("graphql_issue.py", SUB_DIR),
-    ("graphql_review.py", SUB_DIR),
+    ("graphql_collector.py", SUB_DIR),
+    ("ownership.py", "."),
+    # Before the team scores, so the version the dashboard shows includes it
+    ("bus_factor.py", "."),
     ("meeting_analyser.py", "."),
-    ("git_analyser.py", "."),
-    ("fusion.py", ".")
 ]
 
+if WAREHOUSE_MODE:
+    SCRIPTS += [("warehouse.py", ".")]
+else:
+    SCRIPTS += [("git_analyser.py", "."), ("fusion.py", ".")]
+
 def run_pipeline():
     print(f"\n🏎️  GREEN LIGHT: Starting Workflow at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-" * 50)